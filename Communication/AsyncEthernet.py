@@ -0,0 +1,195 @@
+# -*- coding: utf-8 -*-
+'''
+asyncio transport for the UDP interface and the commands
+
+One event loop drives many radars: every radar gets its own AsyncEnetUdpInterface on an
+asyncio datagram endpoint and its own AsyncCommands, and the commands of all radars are
+awaited together, each with its own timeout. No thread per radar is needed.
+'''
+
+import asyncio
+from Communication.Interface import Interface
+from Communication.EthernetInterfaces import EnetConfig
+from Communication.Commands import Commands, CommandError
+
+'================================================================================='
+class _NeedDatagram(BaseException):
+    'Raised by AsyncEnetUdpInterface when a command reads a datagram not received yet.'
+    'It is a BaseException, so it passes Interface.Receive, which turns every Exception'
+    'into a return value, and the receive loops of the cmd_ functions, and stops the'
+    'command at once.'
+
+'================================================================================='
+class _UdpProtocol(asyncio.DatagramProtocol):
+    'Hands datagrams and errors of the endpoint to the interface'
+    def __init__(self, interface):
+        self.interface = interface
+
+    def datagram_received(self, data, addr):
+        self.interface._onDatagram(data, addr)
+
+    def error_received(self, exc):
+        self.interface._onError(exc)
+
+'================================================================================='
+class AsyncEnetUdpInterface(Interface):
+    'UDP interface on an asyncio datagram endpoint instead of a blocking socket.'
+    'Reads never block: datagrams received for the current command are collected and'
+    'read in order. If the next one has not arrived yet, the read raises _NeedDatagram.'
+    'AsyncCommands then awaits the datagram and runs the command again, which reads the'
+    'collected datagrams from the start and skips sending the requests sent already by'
+    'the previous runs.'
+
+    def __init__(self, enetConfig):
+
+        Interface.__init__(self, name="AsyncEthernetUdpInterface", interfaceType="Ethernet")
+
+        self.config = enetConfig
+
+        self.transport = None
+
+        self.hostIp = ""
+        self.hostPort = 0
+
+        self._datagrams = []    # (data, address) received for the current command
+        self._arrived = None    # asyncio.Event, set when a datagram or error arrives
+        self._error = None
+        self._numRead = 0       # datagrams read by the current run of the command
+        self._numWritten = 0    # requests written by the current run of the command
+        self._numSent = 0       # requests actually sent for the current command
+
+    '-----------------------------------------------------------------------------'
+    async def OpenAsync(self):
+        'Open UDP endpoint on the running event loop'
+        self.resetErrors()
+        self.Close()
+        try:
+            loop = asyncio.get_running_loop()
+            self._arrived = asyncio.Event()
+            self.transport, _ = await loop.create_datagram_endpoint(lambda: _UdpProtocol(self),
+                                                                    local_addr=('0.0.0.0', self.config.OwnPort))
+        except Exception as E:
+            self.errorCode |= self.ERR_IF_OPEN
+            self.errorString = "Error while opening UDP endpoint: "+str(E)
+            self.Close()
+        return self.IsOpen()
+
+    '-----------------------------------------------------------------------------'
+    def Open(self):
+        'The endpoint can only be opened by OpenAsync, returns whether it is open'
+        return self.IsOpen()
+
+    '-----------------------------------------------------------------------------'
+    def Close(self):
+        'Close UDP endpoint'
+        if self.transport is not None:
+            self.transport.close()
+            self.transport = None
+
+    '-----------------------------------------------------------------------------'
+    def IsOpen(self):
+        return self.transport is not None and not self.transport.is_closing()
+
+    '-----------------------------------------------------------------------------'
+    def Write(self, data):
+        self._numWritten += 1
+        if self._numWritten > self._numSent:   # else sent by a previous run of the command
+            self.transport.sendto(bytes(data), (self.config.IP, self.config.Port))
+            self._numSent += 1
+        return len(data)
+
+    '-----------------------------------------------------------------------------'
+    def ReadInto(self, buf):
+        if self._numRead == len(self._datagrams):
+            raise _NeedDatagram()
+        data, (self.hostIp, self.hostPort) = self._datagrams[self._numRead]
+        self._numRead += 1
+        # like recvfrom_into, the rest of a datagram longer than buf is lost
+        nRcvd = min(len(data), len(buf))
+        buf[:nRcvd] = data[:nRcvd]
+        return nRcvd
+
+    '-----------------------------------------------------------------------------'
+    def _onDatagram(self, data, addr):
+        self._datagrams.append((data, addr[:2]))
+        self._arrived.set()
+
+    '-----------------------------------------------------------------------------'
+    def _onError(self, exc):
+        self._error = exc
+        self._arrived.set()
+
+    '-----------------------------------------------------------------------------'
+    def beginCommand(self):
+        'Drops datagrams left from previous commands, e.g. late responses'
+        self._datagrams.clear()
+        self._numSent = 0
+        self._error = None
+
+    '-----------------------------------------------------------------------------'
+    def beginRun(self):
+        'Starts a (repeated) run of the current command'
+        self._numRead = self._numWritten = 0
+
+    '-----------------------------------------------------------------------------'
+    async def waitDatagram(self, timeout):
+        'Waits for the next datagram. Returns False on timeout.'
+        self._arrived.clear()
+        try:
+            await asyncio.wait_for(self._arrived.wait(), max(timeout, 0))
+        except asyncio.TimeoutError:
+            return False
+        if self._error is not None:
+            raise self._error
+        return True
+
+'================================================================================='
+class AsyncCommands(Commands):
+    'Commands with executeCmdAsync, the counterpart of executeCmd for an'
+    'AsyncEnetUdpInterface. The cmd_ functions are the same as for the blocking'
+    'interfaces, so every command is available.'
+
+    def __init__(self, *args, **kw):
+        Commands.__init__(self, *args, **kw)
+        self.asyncLock = asyncio.Lock()   # one command at a time per radar
+
+    '-----------------------------------------------------------------------------'
+    async def executeCmdAsync(self, cmdID, *opt, timeout=None, **kw):
+        'Executes a command without blocking the event loop.'
+        'timeout: seconds for the whole command, default is Timeout of the interface config.'
+        'Raises CommandError if the response is not complete in time.'
+        interface = self.myInterface
+        if interface is None:
+            raise CommandError("No interface defined")
+        handle = self.resolveCmd(cmdID)
+        if timeout is None:
+            timeout = interface.config.Timeout
+        loop = asyncio.get_running_loop()
+        async with self.asyncLock:
+            deadline = loop.time() + timeout
+            interface.beginCommand()
+            while True:
+                # run command up to the first datagram not received yet
+                interface.beginRun()
+                try:
+                    return self.executeResolved(handle, *opt, **kw)
+                except _NeedDatagram:
+                    pass
+                if not await interface.waitDatagram(deadline - loop.time()):
+                    raise CommandError("Timeout in Command 0x%X"%handle[1])
+
+'-----------------------------------------------------------------------------'
+async def openRadar(IP_str, Port=4120, OwnPort=4100, Timeout=1.0, **kw):
+    'Opens an AsyncEnetUdpInterface and returns AsyncCommands using it.'
+    'Every radar needs its own OwnPort. Further keywords are passed to AsyncCommands.'
+    interface = AsyncEnetUdpInterface(EnetConfig(IP_str, Port, OwnPort, Timeout=Timeout))
+    if not await interface.OpenAsync():
+        raise CommandError(interface.getErrorString())
+    return AsyncCommands(interface=interface, **kw)
+
+'-----------------------------------------------------------------------------'
+async def executeAll(commands, cmdID, *opt, timeout=None, **kw):
+    'Executes a command on several radars at once.'
+    'Returns the results in the order of commands, for a radar that failed its exception.'
+    return await asyncio.gather(*(cmd.executeCmdAsync(cmdID, *opt, timeout=timeout, **kw) for cmd in commands),
+                                return_exceptions=True)
@@ -5,8 +5,6 @@ Created on 17.04.2020
 @author: IMST GmbH
 '''
 
-import serial
-from serial.tools.list_ports import comports
 from Communication.Interface import Interface
 
 VID = 0x10C4    # Vendor ID
@@ -16,6 +14,8 @@ BAUDRATE = 2000000
 
 def GetPorts():
     'Look for connected CP210X chips and return COMx strings'
+    # pyserial is imported on first use, so importing this module stays cheap
+    from serial.tools.list_ports import comports
     res = []
     for p in comports():
         if p.vid == VID and p.pid == PID:
@@ -41,6 +41,7 @@ class CP210X_USB_Interface(Interface):
             self.Close()
             if self.usedPort is None:
                 raise Exception("No port selected to open.")            
+            import serial
             self.com = serial.Serial(self.usedPort.device, BAUDRATE, serial.EIGHTBITS, serial.PARITY_EVEN, serial.STOPBITS_ONE, timeout=1, write_timeout=1)            
             return self.com.isOpen()
             
@@ -64,6 +65,10 @@ class CP210X_USB_Interface(Interface):
     def Read(self, n):
         return self.com.read(n)
     
+    '-----------------------------------------------------------------------------'
+    def ReadInto(self, buf):
+        return self.com.readinto(buf)
+    
     '-----------------------------------------------------------------------------'
     def ResetBuffer(self):
         self.com.reset_input_buffer()
@@ -6,6 +6,7 @@ Created on 23.04.2020
 '''
 
 from struct import pack
+from binascii import crc_hqx
 
 '====================== CRC16 ======================'
 CRC16_START = 0xFFFF
@@ -70,9 +71,15 @@ class CRC16(object):
         self.crc16_value &= 0xFFFF  # cut bits greater 16-bit        
         
     '-----------------------------------------------------------------------------'
-    def process_buf(self, buf, length):
-        for n in range(length):
-            self.process_byte(buf[n])        
+    def process_buf(self, buf, length, start=0):
+        'Processes bytes buf[start:length]. Buffers supporting the buffer protocol'
+        '(bytes, bytearray, memoryview) are processed in one call by crc_hqx which'
+        'implements the same CCITT polynomial, other sequences byte by byte.'
+        if self._use_table and not isinstance(buf, (list, tuple)):
+            self.crc16_value = crc_hqx(memoryview(buf)[start:length], self.crc16_value)
+        else:
+            for n in range(start, length):
+                self.process_byte(buf[n])
     
     '-----------------------------------------------------------------------------'
     def get_crc_value_as_byte_list(self):
@@ -88,4 +95,31 @@ class CRC16(object):
     def get_crc_value(self):
         'Returns CRC16 value'
         return self.crc16_value
-    
\ No newline at end of file
+
+
+'-----------------------------------------------------------------------------'
+def self_test(num=200, maxLen=4096):
+    'Compares bulk processing against byte-wise table and bitwise calculation'
+    'for random buffers and split points. Returns True if all results match.'
+    import random
+    for n in range(num):
+        data = bytearray(random.getrandbits(8) for _ in range(random.randint(0, maxLen)))
+        split = random.randint(0, len(data))
+        
+        ref = CRC16()
+        for b in data:
+            ref.process_byte(b)
+        bits = CRC16(use_table=False)
+        bits.process_buf(data, len(data))
+        
+        bulk = CRC16()
+        bulk.process_buf(data, split)
+        bulk.process_buf(data, len(data), split)
+        if not (ref.get_crc_value() == bits.get_crc_value() == bulk.get_crc_value()):
+            print("CRC mismatch for %d bytes (split %d)"%(len(data), split))
+            return False
+    return True
+
+
+if __name__ == "__main__":
+    print("CRC16 self test " + ("passed" if self_test() else "FAILED"))
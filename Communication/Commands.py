@@ -7,6 +7,8 @@ Created on 06.01.2022
 
 from Communication.CRC import CRC16
 from time import sleep, time
+import threading
+import numpy as np
 import Parameters as Par
 
 
@@ -84,9 +86,26 @@ CRC_SIZE = 2
 
 RADAR_MAX_BUF_SIZE = 40*1024  # [bytes]
 
+# commands whose results are cached by executeCached with their time to live [s],
+# None means until the cache is invalidated by a command changing the configuration
+CACHED_CMDS = {CMD_INFO: None,
+               CMD_GET_FRONTEND_PARAMS: None,
+               CMD_GET_RADAR_PARAMS: None,
+               CMD_GET_FE_SENSORS: 10.0}   # sensor values drift, so only reuse them shortly
+# commands starting with these IDs invalidate the cache
+CACHE_INVALIDATING_CMDS = ("CMD_SET_", "CMD_RESET_", CMD_FW_UPD_FLASH_START)
+
+# record layouts of target lists
+DETECTION_LAYOUT = "HhHhh"      # rangeBin, dopplerBin, magnitude, aziAngle, eleAngle
+TRACK_LAYOUT = "HffHffI"        # idNumber, tarRange, speed, magnitude, aziAngle, eleAngle, lifeTime
+
 class Commands(object):
     
-    def __init__(self, infoParams=None, radarParams=None, frontendParams=None, enetParams=None, interface=None, useCrc=True):
+    def __init__(self, infoParams=None, radarParams=None, frontendParams=None, enetParams=None, interface=None, useCrc=True, useBuffers=False):
+        'useBuffers : if True, raw data, range data and range-Doppler map commands'
+        'return NumPy arrays owned by this object which are filled in place by each'
+        'call (see _getBuffer). Results are overwritten by the next call of the same'
+        'command, so copy them if they must be kept.'
         
         self.infoParams = infoParams
         if self.infoParams is None:
@@ -111,6 +130,11 @@ class Commands(object):
         
         self.useCrc = useCrc    # if True, CRC16 is used for data transmission, else not
         self.crc16 = CRC16()
+        self._crcPos = 0        # number of received bytes already processed by crc16
+        
+        self.useBuffers = useBuffers
+        self._buffers = {}      # name -> preallocated output array
+        self._results = {}      # name -> reused output dict
         
         self.cmd_list = {}
         self.cmd_list[CMD_GET_ERRORS]               = (0xE000, self.cmd_getErrors)
@@ -176,8 +200,15 @@ class Commands(object):
         self.cmd_list[CMD_FW_UPD_FLASH_START]       = (0xFDA8, self.cmd_fwUpdFlashStart)
         # ...
         
+        # reverse index code -> command ID and resolved handles of all commands
+        self.cmd_codes = {code: cmdID for cmdID, (code, func) in self.cmd_list.items()}
+        self._handles = {cmdID: self._makeHandle(cmdID) for cmdID in self.cmd_list}
+        
         self.curCmdCode = None  # to save current used command code for comparison
         self.stateRcvd = 0      # to save current received radar state for later
+        
+        self.lock = threading.RLock()   # serializes commands if several threads use this radar
+        self._cache = {}        # cmdID -> (result, time) of commands in CACHED_CMDS
 
     '-----------------------------------------------------------------------------'
     def paramsAccepted(self):
@@ -187,6 +218,35 @@ class Commands(object):
     def hasRadarError(self):
         return self.stateRcvd & (CMD_STATE_ACUTE_GLOBAL_ERROR | CMD_STATE_GLOBAL_ERROR_LOGGED)
 
+    '-----------------------------------------------------------------------------'
+    def getActiveRxChannels(self):
+        'Returns list of enabled rx channel numbers in the order they are sent'
+        rp = self.radarParams
+        return [c for c in range(rp.getMaxNumRxChan()) if ((1<<c) & rp.RxChannels) > 0]
+
+    '-----------------------------------------------------------------------------'
+    def _rxComplexList(self, length):
+        'Reads length complex values sent as int16 (real, imag) pairs into a list'
+        vals = self.myInterface.RxArray(2*length, -2)
+        return [complex(re, im) for re, im in zip(vals[0::2], vals[1::2])]
+
+    '-----------------------------------------------------------------------------'
+    def _getBuffer(self, name, shape, dtype):
+        'Returns preallocated output array name. It is only reallocated if shape or'
+        'dtype changed, e.g. after another radar cube was set by updateInternals.'
+        buf = self._buffers.get(name)
+        if buf is None or buf.shape != shape or buf.dtype != dtype:
+            buf = self._buffers[name] = np.empty(shape, dtype)
+        return buf
+    
+    '-----------------------------------------------------------------------------'
+    def _getResult(self, name):
+        'Returns output dict name which is reused by each call of a command'
+        res = self._results.get(name)
+        if res is None:
+            res = self._results[name] = {"data": {}}
+        return res
+
     '-----------------------------------------------------------------------------'
     def setInterface(self, interface):
         self.myInterface = interface
@@ -196,31 +256,76 @@ class Commands(object):
         return self.myInterface
     
     '-----------------------------------------------------------------------------'
-    def executeCmd(self, cmdID, *opt):
-        if self.myInterface is None:
-            raise CommandError("No interface defined")
+    def _makeHandle(self, cmdID):
+        'Handle of a command: (cmdID, code, func, invalidates cache, is cached)'
+        code, func = self.cmd_list[cmdID]
+        return (cmdID, code, func, cmdID.startswith(CACHE_INVALIDATING_CMDS), cmdID in CACHED_CMDS)
+    
+    '-----------------------------------------------------------------------------'
+    def resolveCmd(self, cmdID):
+        'Returns the handle of a command given by ID string or code, for executeResolved.'
+        'Resolve a command once before a loop which executes it at high rate.'
         # get cmd ID string if int was entered
         if type(cmdID) == int:
-            for cmd in self.cmd_list.keys():
-                if self.cmd_list[cmd][0] == cmdID:
-                    cmdID = cmd                            
-        if not cmdID in self.cmd_list:
-            raise CommandError("Invalid command ID: {}".format(cmdID))
-        # Get command code and function
-        code, func = self.cmd_list[cmdID]
-        # save code for comparison
-        self.curCmdCode = code
-        # reset state
-        self.stateRcvd = 0
-        # Clear TX and RX buffer
-        self.myInterface.clearBuffer()
-        # Add command code to TX buffer
-        self.myInterface.TxU16(code)
-        # Perform command
-        ret = func(*opt)
-        # check returned state
-        self.onRadarState()
-        return ret
+            cmdID = self.cmd_codes.get(cmdID, cmdID)
+        handle = self._handles.get(cmdID)
+        if handle is None:
+            if cmdID not in self.cmd_list:
+                raise CommandError("Invalid command ID: {}".format(cmdID))
+            handle = self._handles[cmdID] = self._makeHandle(cmdID)   # added to cmd_list later
+        return handle
+    
+    '-----------------------------------------------------------------------------'
+    def executeCmd(self, cmdID, *opt, **kw):
+        if self.myInterface is None:
+            raise CommandError("No interface defined")
+        return self.executeResolved(self.resolveCmd(cmdID), *opt, **kw)
+    
+    '-----------------------------------------------------------------------------'
+    def executeResolved(self, handle, *opt, **kw):
+        'Executes a command resolved by resolveCmd, skipping the command lookup'
+        if self.myInterface is None:
+            raise CommandError("No interface defined")
+        cmdID, code, func, invalidates, cached = handle
+        # buffers and state are shared, so only one command at a time
+        with self.lock:
+            if invalidates:
+                self.invalidateCache()
+            # save code for comparison
+            self.curCmdCode = code
+            # reset state
+            self.stateRcvd = 0
+            # Clear TX and RX buffer
+            self.myInterface.clearBuffer()
+            # Add command code to TX buffer
+            self.myInterface.TxU16(code)
+            # Perform command
+            ret = func(*opt, **kw)
+            # check returned state
+            self.onRadarState()
+            if cached:
+                self._cache[cmdID] = (ret, time())
+            return ret
+    
+    '-----------------------------------------------------------------------------'
+    def executeCached(self, cmdID):
+        'Returns result of a command listed in CACHED_CMDS from the cache, if it is'
+        'there and not older than its time to live. Else the command is executed.'
+        'Any command changing the configuration invalidates the cache.'
+        if cmdID not in CACHED_CMDS:
+            raise CommandError("Command can't be cached: {}".format(cmdID))
+        with self.lock:
+            entry = self._cache.get(cmdID)
+            if entry is not None:
+                ttl = CACHED_CMDS[cmdID]
+                if ttl is None or time() - entry[1] < ttl:
+                    return entry[0]
+            return self.executeCmd(cmdID)
+    
+    '-----------------------------------------------------------------------------'
+    def invalidateCache(self):
+        with self.lock:
+            self._cache.clear()
 
     '-----------------------------------------------------------------------------'
     def onRadarState(self):
@@ -269,15 +374,15 @@ class Commands(object):
                 self.onRadarState()
             raise Exception(self.myInterface.getErrorString())
         
-        'calculate and check CRC value if enabled'
+        'update running CRC with new bytes and check it if enabled'
         if self.useCrc:
             if withAck:   # only reset on start of command
                 self.crc16.reset()
+                self._crcPos = 0
+            self.updateRxCrc()
 
             if checkCRC:    # enable checking if it is the only or last call of Receive
-                self.crc16.process_buf(self.myInterface.getRxBuf(), self.myInterface.getNumReceived())
-                if self.crc16.get_crc_value() != 0:
-                    raise CommandError("CRC Error")
+                self.checkRxCrc()
         
         'read acknowledge and state word if enabled'
         if withAck:
@@ -300,6 +405,20 @@ class Commands(object):
             raise Exception("Wrong data length.")
         return rL
         
+    '-----------------------------------------------------------------------------'
+    def updateRxCrc(self):
+        'Folds bytes received since last call into running CRC, so each packet is'
+        'processed once when it arrives and not again at the end of the command'
+        numRcvd = self.myInterface.getNumReceived()
+        self.crc16.process_buf(self.myInterface.getRxBuf(), numRcvd, self._crcPos)
+        self._crcPos = numRcvd
+        
+    '-----------------------------------------------------------------------------'
+    def checkRxCrc(self):
+        'Checks running CRC of all bytes received for current command'
+        if self.crc16.get_crc_value() != 0:
+            raise CommandError("CRC Error")
+        
     '-----------------------------------------------------------------------------'
     def Transceive(self, rxLen=0, delaySeconds=0.0, rxLessOk=False):
         self.Transmit()
@@ -312,9 +431,7 @@ class Commands(object):
         self.Transceive(34)    # (1+16)*2
         
         gMask = self.myInterface.RxU16()
-        masks = []
-        for _ in range(16):
-            masks.append(self.myInterface.RxU16())
+        masks = self.myInterface.RxArray(16, 2)
         return (gMask, masks)
 
     '-----------------------------------------------------------------------------'
@@ -322,9 +439,7 @@ class Commands(object):
         self.Transceive(34)    # (1+16)*2
         
         gMask = self.myInterface.RxU16()
-        masks = []
-        for _ in range(16):
-            masks.append(self.myInterface.RxU16())
+        masks = self.myInterface.RxArray(16, 2)
         return (gMask, masks)
 
     '-----------------------------------------------------------------------------'
@@ -350,9 +465,8 @@ class Commands(object):
                 rest = 10 * nErr - (rl - nMin)
                 self.Receive(rest, withAck=False, withCRC=True, checkCRC=True)
         
-        errLog = []
-        for _ in range(nErr):
-            errLog.append((self.myInterface.RxU64(), self.myInterface.RxU16()))     # time [ms], error
+        vals = self.myInterface.RxStruct("QH"*nErr)
+        errLog = list(zip(vals[0::2], vals[1::2]))     # time [ms], error
             
         return errLog
 
@@ -363,11 +477,11 @@ class Commands(object):
     '-----------------------------------------------------------------------------'
     def cmd_getInfo(self):
         self.Transceive(5*4)
-        self.infoParams.deviceNumber       = self.myInterface.RxU32()
-        self.infoParams.frontendConnected  = self.myInterface.RxU32()
-        self.infoParams.fwVersion          = self.myInterface.RxU32()
-        self.infoParams.fwRevision         = self.myInterface.RxU32()
-        self.infoParams.fwDate             = self.myInterface.RxU32()
+        (self.infoParams.deviceNumber,
+         self.infoParams.frontendConnected,
+         self.infoParams.fwVersion,
+         self.infoParams.fwRevision,
+         self.infoParams.fwDate) = self.myInterface.RxStruct("5I")
                     
         return self.infoParams
 
@@ -381,13 +495,10 @@ class Commands(object):
 
         response = {}
 
-        response["FeSensor_1"] = self.myInterface.RxI32()
-
-        response["FeSensor_2"] = self.myInterface.RxI32()
-
-        response["FeSensor_3"] = self.myInterface.RxI32()
-
-        response["FeSensor_4"] = self.myInterface.RxI32()
+        (response["FeSensor_1"],
+         response["FeSensor_2"],
+         response["FeSensor_3"],
+         response["FeSensor_4"]) = self.myInterface.RxStruct("4i")
 
         return response
     
@@ -407,38 +518,7 @@ class Commands(object):
     def cmd_getRadarParams(self):
         rp = self.radarParams
         self.Transceive(60)
-        rp.RadarCube            = self.myInterface.RxU16()
-        rp.ContinuousMeas       = self.myInterface.RxU8()
-        rp.MeasInterval         = self.myInterface.RxU16()
-        rp.Processing           = self.myInterface.RxU16()
-        rp.RangeWinFunc         = self.myInterface.RxU16()
-        rp.DopplerWinFunc       = self.myInterface.RxU16()
-        rp.DopplerFftShift      = self.myInterface.RxU8()
-        rp.MinRangeBin          = self.myInterface.RxU16()
-        rp.MaxRangeBin          = self.myInterface.RxU16()
-        rp.MinDopplerBin        = self.myInterface.RxI16()
-        rp.MaxDopplerBin        = self.myInterface.RxI16()
-        rp.CfarWindowSize       = self.myInterface.RxU16()
-        rp.CfarGuardInt         = self.myInterface.RxU16()
-        rp.RangeCfarThresh      = self.myInterface.RxU16()
-        rp.TriggerThresh        = self.myInterface.RxI16()  # !
-        rp.PeakSearchThresh     = self.myInterface.RxU16()
-        rp.SuppressStaticTargets= self.myInterface.RxU16()
-        rp.MaxTargets           = self.myInterface.RxU16()
-        rp.MaxTracks            = self.myInterface.RxU16()
-        rp.MaxHorSpeed          = self.myInterface.RxU16()
-        rp.MaxVerSpeed          = self.myInterface.RxU16()
-        rp.MaxAccel             = self.myInterface.RxU16()
-        rp.MaxRangeError        = self.myInterface.RxU16()
-        rp.MinConfirm           = self.myInterface.RxU16()
-        rp.TargetSize           = self.myInterface.RxU16()
-        rp.MergeLimit           = self.myInterface.RxU16()
-        rp.SectorFiltering      = self.myInterface.RxU8()
-        rp.SpeedEstimation      = self.myInterface.RxU16()
-        rp.DspDopplerProc       = self.myInterface.RxU8()
-        rp.RxChannels           = self.myInterface.RxU16()
-        rp.CfarSelect           = self.myInterface.RxU16()
-        rp.DopplerCfarThresh    = self.myInterface.RxU16()
+        rp.LAYOUT.fromValues(rp, self.myInterface.RxStruct(rp.LAYOUT.format))
         rp.updateInternals()
         return rp
 
@@ -449,38 +529,7 @@ class Commands(object):
             update = False
             rp = self.radarParams
         
-        self.myInterface.TxU16(rp.RadarCube)
-        self.myInterface.TxU8(rp.ContinuousMeas)
-        self.myInterface.TxU16(rp.MeasInterval)
-        self.myInterface.TxU16(rp.Processing)
-        self.myInterface.TxU16(rp.RangeWinFunc)
-        self.myInterface.TxU16(rp.DopplerWinFunc)
-        self.myInterface.TxU8(rp.DopplerFftShift)
-        self.myInterface.TxU16(rp.MinRangeBin)
-        self.myInterface.TxU16(rp.MaxRangeBin)
-        self.myInterface.TxI16(rp.MinDopplerBin)
-        self.myInterface.TxI16(rp.MaxDopplerBin)
-        self.myInterface.TxU16(rp.CfarWindowSize)
-        self.myInterface.TxU16(rp.CfarGuardInt)
-        self.myInterface.TxU16(rp.RangeCfarThresh)
-        self.myInterface.TxI16(rp.TriggerThresh)  # !
-        self.myInterface.TxU16(rp.PeakSearchThresh)
-        self.myInterface.TxU16(rp.SuppressStaticTargets)
-        self.myInterface.TxU16(rp.MaxTargets)
-        self.myInterface.TxU16(rp.MaxTracks)
-        self.myInterface.TxU16(rp.MaxHorSpeed)
-        self.myInterface.TxU16(rp.MaxVerSpeed)
-        self.myInterface.TxU16(rp.MaxAccel)
-        self.myInterface.TxU16(rp.MaxRangeError)
-        self.myInterface.TxU16(rp.MinConfirm)
-        self.myInterface.TxU16(rp.TargetSize)
-        self.myInterface.TxU16(rp.MergeLimit)
-        self.myInterface.TxU8(rp.SectorFiltering)
-        self.myInterface.TxU16(rp.SpeedEstimation)
-        self.myInterface.TxU8(rp.DspDopplerProc)
-        self.myInterface.TxU16(rp.RxChannels)
-        self.myInterface.TxU16(rp.CfarSelect)
-        self.myInterface.TxU16(rp.DopplerCfarThresh)
+        self.myInterface.TxStruct(rp.LAYOUT.format, *rp.LAYOUT.toValues(rp))
         self.Transceive()
         
         if update:
@@ -494,31 +543,14 @@ class Commands(object):
     def cmd_getRadarResolution(self):
         self.Transceive(4*4)
         res = {}
-        res["If"]       = self.myInterface.RxFloat()
-        res["Range"]    = self.myInterface.RxFloat()
-        res["Doppler"]  = self.myInterface.RxFloat()
-        res["Speed"]    = self.myInterface.RxFloat()
+        res["If"], res["Range"], res["Doppler"], res["Speed"] = self.myInterface.RxStruct("4f")
         return res
 
     '-----------------------------------------------------------------------------'
     def cmd_getFrontendParams(self):
         fp = self.frontendParams
         self.Transceive(42)
-        fp.MinFrequency         = self.myInterface.RxU32()
-        fp.MaxFrequency         = self.myInterface.RxU32()
-        fp.SignalType           = self.myInterface.RxU16()
-        fp.TxChannelSelection   = self.myInterface.RxU16()
-        fp.RxChannelSelection   = self.myInterface.RxU16()
-        fp.TxPowerSetting       = self.myInterface.RxI16()
-        fp.RxPowerSetting       = self.myInterface.RxI16()
-        fp.RampInit             = self.myInterface.RxU32()
-        fp.RampTime             = self.myInterface.RxU32()
-        fp.RampReset            = self.myInterface.RxU32()
-        fp.RampDelay            = self.myInterface.RxU32()
-        fp.OptParam1            = self.myInterface.RxI16()
-        fp.OptParam2            = self.myInterface.RxI16()
-        fp.OptParam3            = self.myInterface.RxI16()
-        fp.OptParam4            = self.myInterface.RxI16()
+        fp.LAYOUT.fromValues(fp, self.myInterface.RxStruct(fp.LAYOUT.format))
         return fp
 
   
@@ -541,21 +573,7 @@ class Commands(object):
             fp = self.frontendParams
             update = False
         
-        self.myInterface.TxU32(fp.MinFrequency)
-        self.myInterface.TxU32(fp.MaxFrequency)
-        self.myInterface.TxU16(fp.SignalType)
-        self.myInterface.TxU16(fp.TxChannelSelection)
-        self.myInterface.TxU16(fp.RxChannelSelection)
-        self.myInterface.TxI16(fp.TxPowerSetting)
-        self.myInterface.TxI16(fp.RxPowerSetting)
-        self.myInterface.TxU32(fp.RampInit)
-        self.myInterface.TxU32(fp.RampTime)
-        self.myInterface.TxU32(fp.RampReset)
-        self.myInterface.TxU32(fp.RampDelay)
-        self.myInterface.TxI16(fp.OptParam1)
-        self.myInterface.TxI16(fp.OptParam2)
-        self.myInterface.TxI16(fp.OptParam3)
-        self.myInterface.TxI16(fp.OptParam4)
+        self.myInterface.TxStruct(fp.LAYOUT.format, *fp.LAYOUT.toValues(fp))
         self.Transceive()
             
         if update:
@@ -573,23 +591,7 @@ class Commands(object):
     def cmd_getEthernetConfig(self):
         self.Transceive(29 + Par.ENET_MAX_TCP_PORTS*2 + Par.ENET_MAX_UDP_PORTS*2 + Par.ENET_MAX_MULTICAST_GROUPS*4)
         ep = self.enetParams
-        ep.DHCP = self.myInterface.RxU8()
-        ep.AutoIP = self.myInterface.RxU8()
-        ep.IP = ep.getIpAsStr( [self.myInterface.RxU8() for _ in range(4)] )
-        for n in range(Par.ENET_MAX_TCP_PORTS):
-            ep.TcpPorts[n] = self.myInterface.RxU16()
-        for n in range(Par.ENET_MAX_UDP_PORTS):
-            ep.UdpPorts[n] = self.myInterface.RxU16()
-        ep.SubnetMask = ep.getIpAsStr( [self.myInterface.RxU8() for _ in range(4)] )
-        ep.DefaultGateway = ep.getIpAsStr( [self.myInterface.RxU8() for _ in range(4)] )
-        for m in range(Par.ENET_MAX_MULTICAST_GROUPS):
-            ep.MulticastGroups[m] = ep.getIpAsStr( [self.myInterface.RxU8() for _ in range(4)] )
-        ep.SntpMode = self.myInterface.RxU8()
-        ep.NtpServer = ep.getIpAsStr( [self.myInterface.RxU8() for _ in range(4)] )
-        
-        ep.UdpMcPort = self.myInterface.RxU16()
-        ep.UdpBcPort = self.myInterface.RxU16()
-        ep.MAC = [self.myInterface.RxU8() for _ in range(6)]
+        ep.LAYOUT.fromValues(ep, self.myInterface.RxStruct(ep.LAYOUT.format))
         return ep
 
     '-----------------------------------------------------------------------------'
@@ -724,6 +726,9 @@ class Commands(object):
             dataSize = self.myInterface.RxU32()
             rest = dataSize + 2 # +CRC
             self.Receive(rest, withAck=False, withCRC=False, checkCRC=False, lessOk=False)
+        
+        if self.useCrc:
+            self.checkRxCrc()
                             
         # read into buffers according to enabled mask bits
         # for better performance, permanent buffers should be allocated before
@@ -740,9 +745,7 @@ class Commands(object):
                 chirp = {}
                 for c in range(rp.getMaxNumRxChan()):
                     if ((1<<c) & rp.RxChannels > 0):
-                        chirp[c] = []
-                        for _s in range(rp._NumSamples):
-                            chirp[c].append(self.myInterface.RxI16())
+                        chirp[c] = self.myInterface.RxArray(rp._NumSamples, -2)
                 dataOut["Raw"].append(chirp)
                             
         else:
@@ -759,13 +762,10 @@ class Commands(object):
                     dataOut["RFFT"] = {}
                     for c in range(4):
                         if ((1<<c) & rp.RxChannels) > 0:
-                            dataOut["RFFT"][c] = []
                             if c < 2:
-                                for _ in range(rp.MinRangeBin, rp.MaxRangeBin+1):
-                                    dataOut["RFFT"][c].append(complex(self.myInterface.RxI16(), self.myInterface.RxI16()))
+                                dataOut["RFFT"][c] = self._rxComplexList(rp._ActiveRangeBins)
                             else:
-                                for _ in range(rp.MinRangeBin, rp.MaxRangeBin+1):
-                                    dataOut["RFFT"][c].append(self.myInterface.RxU16())
+                                dataOut["RFFT"][c] = self.myInterface.RxArray(rp._ActiveRangeBins, 2)
                     
                     dataOut["RFFT"]["chan"] = self.myInterface.RxU16()
                     dataOut["RFFT"]["rbin"] = self.myInterface.RxU16()
@@ -779,9 +779,7 @@ class Commands(object):
                         chirp = {}
                         for c in range(rp.getMaxNumRxChan()):
                             if ((1<<c) & rp.RxChannels) > 0:
-                                chirp[c] = []
-                                for _r in range(rp.MinRangeBin, rp.MaxRangeBin+1):
-                                    chirp[c].append(complex(self.myInterface.RxI16(), self.myInterface.RxI16()))
+                                chirp[c] = self._rxComplexList(rp._ActiveRangeBins)
                         dataOut["RFFT"].append(chirp)
             
             #********** doppler FFT **********
@@ -794,34 +792,26 @@ class Commands(object):
                     spec = {}
                     for c in range(rp.getMaxNumRxChan()):
                         if ((1<<c) & rp.RxChannels) > 0:
-                            spec[c] = []
-                            for _ in rp._dBinIdxs:
-                                spec.append(complex(self.myInterface.RxI16(), self.myInterface.RxI16()))
+                            spec[c] = self._rxComplexList(len(rp._dBinIdxs))
                     dataOut["DFFT"].append(spec)
                 
             #********** magnitude map **********
             if dataMask & 0x4:
                 dataOut["MagMap"] = []
                 for _d in rp._dBinIdxs:
-                    dataOut["MagMap"].append([])
-                    for _r in range(rp.MinRangeBin, rp.MaxRangeBin+1):
-                        dataOut["MagMap"][-1].append(self.myInterface.RxU16())
+                    dataOut["MagMap"].append(self.myInterface.RxArray(rp._ActiveRangeBins, 2))
     
             #********** peak map **********
             if dataMask & 0x8:
                 dataOut["PeakMap"] = []
                 for _d in range(0, rp._NumDopplerBins):
-                    dataOut["PeakMap"].append([])
-                    for _r in range(int(rp._NumRangeBins>>5)):  # sent as longs
-                        dataOut["PeakMap"][-1].append(self.myInterface.RxU32())
+                    dataOut["PeakMap"].append(self.myInterface.RxArray(int(rp._NumRangeBins>>5), 4))  # sent as longs
             
             #********** CFAR map **********
             if dataMask & 0x10:
                 dataOut["CfarMap"] = []
                 for _d in range(rp._NumDopplerBins):
-                    dataOut["CfarMap"].append([])
-                    for _r in range(int(rp._NumRangeBins>>5)):  # sent as longs
-                        dataOut["CfarMap"][-1].append(self.myInterface.RxU32())
+                    dataOut["CfarMap"].append(self.myInterface.RxArray(int(rp._NumRangeBins>>5), 4))  # sent as longs
                         
             #********** detection data **********
             if dataMask & 0x20:
@@ -832,11 +822,8 @@ class Commands(object):
                 self.detections.numTargets = self.myInterface.RxU16()
                 # read list
                 for n in range(self.detections.numTargets):
-                    self.detections.targets[n].rangeBin = self.myInterface.RxU16()
-                    self.detections.targets[n].dopplerBin = self.myInterface.RxI16()
-                    self.detections.targets[n].magnitude = self.myInterface.RxU16()
-                    self.detections.targets[n].aziAngle = self.myInterface.RxI16()
-                    self.detections.targets[n].eleAngle = self.myInterface.RxI16()
+                    t = self.detections.targets[n]
+                    t.rangeBin, t.dopplerBin, t.magnitude, t.aziAngle, t.eleAngle = self.myInterface.RxStruct(DETECTION_LAYOUT)
                 dataOut["Detections"] = self.detections
             
             #********** tracking data **********
@@ -851,17 +838,10 @@ class Commands(object):
                 # read list
                 self.tracks.dopplerSpectra = [None]*Par.MAX_NUM_TRACKS
                 for n in range(self.tracks.numTargets):
-                    self.tracks.targets[n].idNumber = self.myInterface.RxU16()
-                    self.tracks.targets[n].tarRange = self.myInterface.RxFloat()
-                    self.tracks.targets[n].speed = self.myInterface.RxFloat()
-                    self.tracks.targets[n].magnitude = self.myInterface.RxU16()
-                    self.tracks.targets[n].aziAngle = self.myInterface.RxFloat()
-                    self.tracks.targets[n].eleAngle = self.myInterface.RxFloat()
-                    self.tracks.targets[n].lifeTime = self.myInterface.RxU32()
+                    t = self.tracks.targets[n]
+                    t.idNumber, t.tarRange, t.speed, t.magnitude, t.aziAngle, t.eleAngle, t.lifeTime = self.myInterface.RxStruct(TRACK_LAYOUT)
                     if self.paramObj.radarParams.DspDopplerProc:
-                        res = []
-                        for _ in range(Par.NUM_NN_CLASSES):
-                            res.append(self.myInterface.RxU16())
+                        res = self.myInterface.RxArray(Par.NUM_NN_CLASSES, 2)
                         self.tracks.inferenceResult[n] = res
                         
                     if dopplerFormat == 1:
@@ -870,22 +850,24 @@ class Commands(object):
                         
                         for c in range(rp.getMaxNumRxChan()):
                             if ((1<<c) & rp.RxChannels) > 0:
-                                self.tracks.dopplerSpectra[n][c] = []
-                                for _ in range(rp._ActiveDopplerBins):
-                                    self.tracks.dopplerSpectra[n][c].append(complex(self.myInterface.RxI16(), self.myInterface.RxI16()))
+                                self.tracks.dopplerSpectra[n][c] = self._rxComplexList(rp._ActiveDopplerBins)
                             
                     elif dopplerFormat >= 2:
                         # read magnitude doppler spectrum
-                        self.tracks.dopplerSpectra[n] = []
-                        for _ in range(rp._ActiveDopplerBins):
-                            self.tracks.dopplerSpectra[n].append(self.myInterface.RxU16())
+                        self.tracks.dopplerSpectra[n] = self.myInterface.RxArray(rp._ActiveDopplerBins, 2)
                             
                 dataOut["Tracks"] = self.tracks
         
         return dataOut
     
     '-----------------------------------------------------------------------------'
-    def cmd_readRawData(self, chirpNum=0):
+    def cmd_readRawData(self, chirpNum=0, asArray=False):
+        'asArray : if True, "data" is returned as big-endian int16 array of shape'
+        '(channels, samples) viewing the RX buffer directly (no copy). The view is'
+        'only valid until the next command, so copy it if it must be kept.'
+        'The channel numbers of the rows are returned in "channels".'
+        'With useBuffers, "data" is a native int16 array of the same shape owned by'
+        'this object and asArray is implied.'
         if chirpNum > self.radarParams._NumDopplerBins-1:
             raise CommandError("Value not supported!")  # here only one chirp is read
         
@@ -895,25 +877,43 @@ class Commands(object):
           
         self.Transceive(2*self.radarParams.getNumActiveRxChan()*samples+8)
         
+        if self.useBuffers:
+            data = self._getResult("raw")
+            data["time"] = self.myInterface.RxU64()
+            data["channels"] = chans = self.getActiveRxChannels()
+            data["data"] = self.myInterface.RxBlockInto(self._getBuffer("raw", (len(chans), samples), np.int16), -2)
+            return data
+        
         data = {}
         data["time"] = self.myInterface.RxU64()
+        
+        if asArray:
+            chans = self.getActiveRxChannels()
+            data["channels"] = chans
+            data["data"] = self.myInterface.RxBlock(len(chans)*samples, -2, copy=False).reshape(len(chans), samples)
+            return data
+        
         data["data"] = {}
         
         for c in range(self.radarParams.getMaxNumRxChan()):
             if ((1<<c) & self.radarParams.RxChannels > 0):
-                data["data"][c] = []
-                for _ in range(samples):
-                    data["data"][c].append(self.myInterface.RxI16())
+                data["data"][c] = self.myInterface.RxArray(samples, -2)
         
         return data
     
     '-----------------------------------------------------------------------------'
-    def cmd_readRangeData(self, chirpNum=0):
+    def cmd_readRangeData(self, chirpNum=0, asArray=False):
+        'asArray : if True, each channel in "data" is decoded with one NumPy call,'
+        'complex channels into complex64 arrays and magnitude channels into uint16 arrays'
+        'With useBuffers, these arrays are owned by this object and asArray is implied.'
         if chirpNum > self.radarParams._NumDopplerBins-1:
             raise CommandError("Value not supported!")  # here only one chirp is read
 
         self.myInterface.TxU16(chirpNum)
         
+        if self.useBuffers:
+            return self._readRangeDataBuffered()
+        
         data = {}
         
         if self.radarParams.RadarCube <= Par.RCUBE_smpl2048_crp1_4rx:
@@ -928,15 +928,20 @@ class Commands(object):
             
             data["time"] = self.myInterface.RxU64()
             data["data"] = {}
-            for c in range(4):
-                if ((1<<c) & self.radarParams.RxChannels) > 0:
-                    data["data"][c] = []
-                    if c < 2:
-                        for _ in range(self.radarParams._ActiveRangeBins):
-                            data["data"][c].append(complex(self.myInterface.RxI16(), self.myInterface.RxI16()))
-                    else:
-                        for _ in range(self.radarParams._ActiveRangeBins):
-                            data["data"][c].append(self.myInterface.RxU16())
+            if asArray:
+                for c in range(4):
+                    if ((1<<c) & self.radarParams.RxChannels) > 0:
+                        if c < 2:
+                            data["data"][c] = self.myInterface.RxComplexBlock(self.radarParams._ActiveRangeBins)
+                        else:
+                            data["data"][c] = self.myInterface.RxBlock(self.radarParams._ActiveRangeBins, 2)
+            else:
+                for c in range(4):
+                    if ((1<<c) & self.radarParams.RxChannels) > 0:
+                        if c < 2:
+                            data["data"][c] = self._rxComplexList(self.radarParams._ActiveRangeBins)
+                        else:
+                            data["data"][c] = self.myInterface.RxArray(self.radarParams._ActiveRangeBins, 2)
             
             data["channel"] = self.myInterface.RxU16()
             data["rangeBin"] = self.myInterface.RxU16()
@@ -947,14 +952,69 @@ class Commands(object):
             
             data["time"] = self.myInterface.RxU64()
             data["data"] = {}
-            for c in range(self.radarParams.getMaxNumRxChan()):
-                if ((1<<c) & self.radarParams.RxChannels) > 0:
-                    data["data"][c] = []
-                    for _ in range(self.radarParams._ActiveRangeBins):
-                        data["data"][c].append(complex(self.myInterface.RxI16(), self.myInterface.RxI16()))
+            if asArray:
+                # all channels are complex here, so the whole block is decoded at once
+                chans = self.getActiveRxChannels()
+                nBins = self.radarParams._ActiveRangeBins
+                block = self.myInterface.RxComplexBlock(len(chans)*nBins).reshape(len(chans), nBins)
+                for n, c in enumerate(chans):
+                    data["data"][c] = block[n]
+            else:
+                for c in range(self.radarParams.getMaxNumRxChan()):
+                    if ((1<<c) & self.radarParams.RxChannels) > 0:
+                        data["data"][c] = self._rxComplexList(self.radarParams._ActiveRangeBins)
                             
         return data
         
+    '-----------------------------------------------------------------------------'
+    def _readRangeDataBuffered(self):
+        'Receive part of cmd_readRangeData filling preallocated arrays'
+        rp = self.radarParams
+        nBins = rp._ActiveRangeBins
+        data = self._getResult("range")
+        chanData = data["data"]
+        
+        if rp.RadarCube <= Par.RCUBE_smpl2048_crp1_4rx:
+            # one chirp kernels
+            chan = bin(rp.RxChannels & 0x3).count("1")  # complex channels
+            nBytes = chan*nBins*4
+            chan = bin(rp.RxChannels & 0xC).count("1")  # magnitude channels
+            nBytes += chan*nBins*2
+            nBytes += 14
+
+            self.Transceive(nBytes)
+            
+            data["time"] = self.myInterface.RxU64()
+            for c in range(4):
+                if ((1<<c) & rp.RxChannels) > 0:
+                    if c < 2:
+                        chanData[c] = self.myInterface.RxComplexBlockInto(self._getBuffer("range%d"%c, (nBins,), np.complex64))
+                    else:
+                        chanData[c] = self.myInterface.RxBlockInto(self._getBuffer("range%d"%c, (nBins,), np.uint16), 2)
+                else:
+                    chanData.pop(c, None)
+            
+            data["channel"] = self.myInterface.RxU16()
+            data["rangeBin"] = self.myInterface.RxU16()
+            data["mag"] = self.myInterface.RxU16()
+            
+        else:
+            self.Transceive(4*rp.getNumActiveRxChan()*nBins+8)
+            
+            data["time"] = self.myInterface.RxU64()
+            for key in ("channel", "rangeBin", "mag"):
+                data.pop(key, None)
+            # all channels are complex here, so the whole block is decoded at once
+            chans = self.getActiveRxChannels()
+            block = self.myInterface.RxComplexBlockInto(self._getBuffer("range", (len(chans), nBins), np.complex64))
+            if list(chanData) != chans or (chans and chanData[chans[0]].base is not block):
+                # row views only change with the buffer or the channel selection
+                chanData.clear()
+                for n, c in enumerate(chans):
+                    chanData[c] = block[n]
+        
+        return data
+        
     '-----------------------------------------------------------------------------'
     def cmd_readDopplerData(self, rangeBin=0):
         if rangeBin > self.radarParams._NumRangeBins-1:
@@ -970,22 +1030,27 @@ class Commands(object):
          
         for c in range(self.radarParams.getMaxNumRxChan()):
             if ((1<<c) & self.radarParams.RxChannels) > 0:
-                data["data"][c] = []
-                for _ in range(self.radarParams._ActiveDopplerBins):
-                    data["data"][c].append(complex(self.myInterface.RxI16(), self.myInterface.RxI16()))
+                data["data"][c] = self._rxComplexList(self.radarParams._ActiveDopplerBins)
         
         return data
     
     '-----------------------------------------------------------------------------'
     def cmd_readRangeDopplerMap(self):
+        'With useBuffers, "data" is a uint16 array of shape (doppler bins, range bins)'
+        'owned by this object instead of a list of lists.'
         self.Transceive(self.radarParams._ActiveRangeBins*self.radarParams._ActiveDopplerBins*2 + 8)
+        if self.useBuffers:
+            data = self._getResult("rdm")
+            data["time"] = self.myInterface.RxU64()
+            shape = (self.radarParams._ActiveDopplerBins, self.radarParams._ActiveRangeBins)
+            data["data"] = self.myInterface.RxBlockInto(self._getBuffer("rdm", shape, np.uint16), 2)
+            return data
+        
         data = {}
         data["time"] = self.myInterface.RxU64()
         data["data"] = []
         for _d in range(self.radarParams._ActiveDopplerBins):
-            data["data"].append([])
-            for _r in range(self.radarParams._ActiveRangeBins):
-                data["data"][-1].append(self.myInterface.RxU16())
+            data["data"].append(self.myInterface.RxArray(self.radarParams._ActiveRangeBins, 2))
                         
         return data
         
@@ -998,9 +1063,7 @@ class Commands(object):
         data["time"] = self.myInterface.RxU64()
         data["data"] = []
         for _d in range(0, self.radarParams._NumDopplerBins):
-            data["data"].append([])
-            for _r in range(int(nR>>2)):  # sent as longs
-                data["data"][-1].append(self.myInterface.RxU32())
+            data["data"].append(self.myInterface.RxArray(int(nR>>2), 4))  # sent as longs
         
         return data
     
@@ -1013,9 +1076,7 @@ class Commands(object):
         data["time"] = self.myInterface.RxU64()
         data["data"] = []    
         for _d in range(self.radarParams._NumDopplerBins):
-            data["data"].append([])
-            for _r in range(int(nR/4)):  # sent as longs
-                data["data"][-1].append(self.myInterface.RxU32())
+            data["data"].append(self.myInterface.RxArray(int(nR/4), 4))  # sent as longs
         
         return data
     
@@ -1030,23 +1091,17 @@ class Commands(object):
         # RD Map Data
         data["rdm_data"] = []
         for _d in range(self.radarParams._ActiveDopplerBins):
-            data["rdm_data"].append([])
-            for _r in range(self.radarParams._ActiveRangeBins):
-                data["rdm_data"][-1].append(self.myInterface.RxU16())
+            data["rdm_data"].append(self.myInterface.RxArray(self.radarParams._ActiveRangeBins, 2))
         
         # Peak Map Data
         data["peak_data"] = []
         for _d in range(self.radarParams._NumDopplerBins):
-            data["peak_data"].append([])
-            for _r in range(int(nR/4)):
-                data["peak_data"][-1].append(self.myInterface.RxU32())
+            data["peak_data"].append(self.myInterface.RxArray(int(nR/4), 4))
                 
         # CFAR Map Data
         data["cfar_data"] = []
         for _d in range(self.radarParams._NumDopplerBins):
-            data["cfar_data"].append([])
-            for _r in range(int(nR/4)):
-                data["cfar_data"][-1].append(self.myInterface.RxU32())
+            data["cfar_data"].append(self.myInterface.RxArray(int(nR/4), 4))
         
         return data
     
@@ -1090,11 +1145,8 @@ class Commands(object):
         if ok:
             # read list
             for n in range(self.detections.numTargets):
-                self.detections.targets[n].rangeBin = self.myInterface.RxU16()
-                self.detections.targets[n].dopplerBin = self.myInterface.RxI16()
-                self.detections.targets[n].magnitude = self.myInterface.RxU16()
-                self.detections.targets[n].aziAngle = self.myInterface.RxI16()
-                self.detections.targets[n].eleAngle = self.myInterface.RxI16()
+                t = self.detections.targets[n]
+                t.rangeBin, t.dopplerBin, t.magnitude, t.aziAngle, t.eleAngle = self.myInterface.RxStruct(DETECTION_LAYOUT)
         else:
             self.detections.numTargets = 0
         
@@ -1138,17 +1190,10 @@ class Commands(object):
                 self.tracks.sysDopplerBin = self.myInterface.RxI16()
                 self.tracks.sysSpeed = self.myInterface.RxI16()
             for n in range(self.tracks.numTargets):
-                self.tracks.targets[n].idNumber = self.myInterface.RxU16()
-                self.tracks.targets[n].tarRange = self.myInterface.RxFloat()
-                self.tracks.targets[n].speed = self.myInterface.RxFloat()
-                self.tracks.targets[n].magnitude = self.myInterface.RxU16()
-                self.tracks.targets[n].aziAngle = self.myInterface.RxFloat()
-                self.tracks.targets[n].eleAngle = self.myInterface.RxFloat()
-                self.tracks.targets[n].lifeTime = self.myInterface.RxU32()
+                t = self.tracks.targets[n]
+                t.idNumber, t.tarRange, t.speed, t.magnitude, t.aziAngle, t.eleAngle, t.lifeTime = self.myInterface.RxStruct(TRACK_LAYOUT)
                 if self.radarParams.DspDopplerProc:
-                    res = []
-                    for _ in range(Par.NUM_NN_CLASSES):
-                        res.append(self.myInterface.RxU16())
+                    res = self.myInterface.RxArray(Par.NUM_NN_CLASSES, 2)
                     self.tracks.targets[n].inferenceResult = res
         else:
             self.tracks.numTargets = 0
@@ -1199,26 +1244,17 @@ class Commands(object):
                     raise CommandError(E)
             
             if self.useCrc:
-                self.crc16.process_buf(self.myInterface.getRxBuf(), self.myInterface.getNumReceived())
-                if self.crc16.get_crc_value() != 0:
-                    raise CommandError("CRC Error")
+                self.checkRxCrc()
             
             ok = True
         
         if ok:
             # read list
             for n in range(self.tracks.numTargets):
-                self.tracks.targets[n].idNumber = self.myInterface.RxU16()
-                self.tracks.targets[n].tarRange = self.myInterface.RxFloat()
-                self.tracks.targets[n].speed = self.myInterface.RxFloat()
-                self.tracks.targets[n].magnitude = self.myInterface.RxU16()
-                self.tracks.targets[n].aziAngle = self.myInterface.RxFloat()
-                self.tracks.targets[n].eleAngle = self.myInterface.RxFloat()
-                self.tracks.targets[n].lifeTime = self.myInterface.RxU32()
+                t = self.tracks.targets[n]
+                t.idNumber, t.tarRange, t.speed, t.magnitude, t.aziAngle, t.eleAngle, t.lifeTime = self.myInterface.RxStruct(TRACK_LAYOUT)
                 if self.radarParams.DspDopplerProc:
-                    res = []
-                    for _ in range(Par.NUM_NN_CLASSES):
-                        res.append(self.myInterface.RxU16())
+                    res = self.myInterface.RxArray(Par.NUM_NN_CLASSES, 2)
                     self.tracks.targets[n].inferenceResult = res
                     
                 if spectra_format == 1:
@@ -1227,15 +1263,11 @@ class Commands(object):
                     
                     for c in range(self.radarParams.getMaxNumRxChan()):
                         if ((1<<c) & self.radarParams.RxChannels) > 0:
-                            self.tracks.targets[n].dopplerSpectra[c] = []
-                            for _ in range(self.radarParams._ActiveDopplerBins):
-                                self.tracks.targets[n].dopplerSpectra[c].append(complex(self.myInterface.RxI16(), self.myInterface.RxI16()))
+                            self.tracks.targets[n].dopplerSpectra[c] = self._rxComplexList(self.radarParams._ActiveDopplerBins)
                         
                 elif spectra_format == 2:
                     # read one magnitude doppler spectrum
-                    self.tracks.targets[n].dopplerSpectra = []
-                    for _ in range(self.radarParams._ActiveDopplerBins):
-                        self.tracks.targets[n].dopplerSpectra.append(self.myInterface.RxU16())
+                    self.tracks.targets[n].dopplerSpectra = self.myInterface.RxArray(self.radarParams._ActiveDopplerBins, 2)
                     
         else:
             self.tracks.numTargets = 0
@@ -1253,18 +1285,17 @@ class Commands(object):
         
         sectors = []
         for _r in range(Par.SECTOR_RANGE_NUM):
-            tmp = []
-            for _a in range(Par.SECTOR_ANGLE_NUM):
-                tmp.append(self.myInterface.RxU8())
+            tmp = self.myInterface.RxArray(Par.SECTOR_ANGLE_NUM, 1)
             sectors.append(tmp)
         
         return sectors
 
     '-----------------------------------------------------------------------------'
     def cmd_setSectorMap(self, sectors):
+        if len(sectors) < Par.SECTOR_RANGE_NUM or any(len(sectors[r]) < Par.SECTOR_ANGLE_NUM for r in range(Par.SECTOR_RANGE_NUM)):
+            raise CommandError("Sector map needs {} rows of {} sectors".format(Par.SECTOR_RANGE_NUM, Par.SECTOR_ANGLE_NUM))
         for r in range(Par.SECTOR_RANGE_NUM):
-            for a in range(Par.SECTOR_ANGLE_NUM):
-                self.myInterface.TxU8(sectors[r][a])
+            self.myInterface.TxArray(sectors[r][:Par.SECTOR_ANGLE_NUM], 1)
         self.Transceive()
             
     '-----------------------------------------------------------------------------'
@@ -1278,15 +1309,13 @@ class Commands(object):
     '-----------------------------------------------------------------------------'
     def cmd_fwUpdData(self, data):
         # just send bytes in data (length doesn't matter, cmd code reflects it)
-        for b in data:
-            self.myInterface.TxU8(b)
+        self.myInterface.TxArray(data, 1)
             
         self.Transceive()
         
     '-----------------------------------------------------------------------------'
     def cmd_fwUpdFlashStart(self, CRCs):
-        for crc in CRCs:
-            self.myInterface.TxU16(crc)
+        self.myInterface.TxArray(CRCs, 2)
         
         self.Transceive()
 
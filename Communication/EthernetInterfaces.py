@@ -105,6 +105,10 @@ class EnetTcpInterface(Interface):
     '-----------------------------------------------------------------------------'
     def Read(self, n):
         return self.socket.recv(n)
+    
+    '-----------------------------------------------------------------------------'
+    def ReadInto(self, buf):
+        return self.socket.recv_into(buf)
         
     '-----------------------------------------------------------------------------'
                
@@ -186,5 +190,10 @@ class EnetUdpInterface(Interface):
         recv = self.socket.recvfrom(n)
         self.hostIp, self.hostPort = recv[1]
         return recv[0]
+    
+    '-----------------------------------------------------------------------------'
+    def ReadInto(self, buf):
+        nRcvd, (self.hostIp, self.hostPort) = self.socket.recvfrom_into(buf)
+        return nRcvd
         
                 
\ No newline at end of file
@@ -8,7 +8,9 @@ Interface baseclass that must be implemented and extended by every other interfa
 '''
 
 import struct
+from functools import lru_cache
 from time import sleep
+import numpy as np
 
 #BYTE_ORDER = '<'    # little-endian
 BYTE_ORDER = '>'    # big-endian
@@ -102,6 +104,13 @@ class Interface(object):
         'Here the interface byte reading function should be'
         return None
     
+    '-----------------------------------------------------------------------------'
+    def ReadInto(self, buf):
+        'Optional: reads up to len(buf) bytes directly into writable buffer buf'
+        '(memoryview) and returns number of bytes read. If None is returned, Read'
+        'is used instead.'
+        return None
+    
     '-----------------------------------------------------------------------------'
     def Transmit(self, openInterface=False):                
         'Transmit TX buffer content'
@@ -148,18 +157,12 @@ class Interface(object):
                 # read as much as possible, if rxLen < 0, every amount of data is ok, else read rxLen or less
                 if rxLen < 0:
                     rxLen = self.__rxBufSize
-                msgPart = self.Read(rxLen)
-                nRcvd = len(msgPart)
-                if (self.__rxWrite + nRcvd) > (self.__rxBufSize-1):
-                    raise Exception("Receive buffer full!")
-                self.__rxBuf[self.__rxWrite:self.__rxWrite+nRcvd] = msgPart
-                self.__rxWrite += nRcvd
+                nRcvd = self.__readToRxBuf(rxLen)
                 if closeInterface: self.Close()
                 return nRcvd
             else:
                 while nRcvdTotal < rxLen:
-                    msgPart = self.Read(min(rxLen-nRcvdTotal, self.__rxBufSize))
-                    nRcvd = len(msgPart)
+                    nRcvd = self.__readToRxBuf(min(rxLen-nRcvdTotal, self.__rxBufSize))
                     if nRcvd == 0:
                         self.errorString = "Receive error: receiving stopped at ({}/{})".format(self.__rxWrite,rxLen)
                         if self.__rxWrite == 0:
@@ -170,10 +173,6 @@ class Interface(object):
                             if DEBUG: print(self.errorString)                            
                         self.errorCode |= self.ERR_IF_RECEIVE_1                                        
                         return 0
-                    if (self.__rxWrite + nRcvd) > (self.__rxBufSize-1):
-                        raise Exception("Receive buffer full!")
-                    self.__rxBuf[self.__rxWrite:self.__rxWrite+nRcvd] = msgPart
-                    self.__rxWrite += nRcvd
                     nRcvdTotal += nRcvd
                     if nRcvd < rxLen and nRcvd == fixedMinSize:
                         if closeInterface: self.Close()
@@ -188,6 +187,24 @@ class Interface(object):
         if closeInterface: self.Close()
         return nRcvdTotal
     
+    '-----------------------------------------------------------------------------'
+    def __readToRxBuf(self, n):
+        'Reads up to n bytes to RX buffer at write position and returns their number.'
+        'Uses ReadInto if implemented by the interface, so data lands directly in'
+        'the buffer without temporary bytes object.'
+        with memoryview(self.__rxBuf)[self.__rxWrite:self.__rxWrite+n] as view:
+            nRcvd = self.ReadInto(view)   # view is released even if reading fails
+        if nRcvd is None:
+            msgPart = self.Read(n)
+            nRcvd = len(msgPart)
+            if (self.__rxWrite + nRcvd) > (self.__rxBufSize-1):
+                raise Exception("Receive buffer full!")
+            self.__rxBuf[self.__rxWrite:self.__rxWrite+nRcvd] = msgPart
+        elif (self.__rxWrite + nRcvd) > (self.__rxBufSize-1):
+            raise Exception("Receive buffer full!")
+        self.__rxWrite += nRcvd
+        return nRcvd
+    
     '-----------------------------------------------------------------------------'
     def Transceive(self, rxLen=0, delaySeconds=0):        
         'Main function. Transmit and receive (both optionally)'
@@ -326,23 +343,16 @@ class Interface(object):
     
     '-----------------------------------------------------------------------------'
     def TxArray(self, Arr, dataType):   # dataType e.g -2 for i16 or 8. for double
-        for val in Arr:
-            if   dataType == 1: self.TxU8(val)
-            elif dataType == -1: self.TxI8(val)
-            elif dataType == 2: self.TxU16(val)
-            elif dataType == -2: self.TxI16(val)
-            elif dataType == 4:
-                if type(dataType) is float: self.TxFloat(val)
-                else: self.TxU32(val)
-            elif dataType == -4:
-                if type(dataType) is float: self.TxFloat(val)
-                else: self.TxI32(val)
-            elif dataType == 8:
-                if type(dataType) is float: self.TxDouble(val)
-                else: self.TxU64(val)
-            elif dataType == -8:
-                if type(dataType) is float: self.TxDouble(val)
-                else: self.TxI64(val)
+        self.TxStruct("%d%s"%(len(Arr), datatype_to_char(dataType)), *Arr)
+    
+    '-----------------------------------------------------------------------------'
+    def TxStruct(self, layout, *values):
+        'Packs values with a record layout (format string without byte order or'
+        'precompiled struct.Struct from get_struct) into TX buffer in one call'
+        if not isinstance(layout, struct.Struct):
+            layout = get_struct(layout, self._minBytes)
+        layout.pack_into(self.__txBuf, self.__txCnt, *values)
+        self.__txCnt += layout.size
             
     '-----------------------------------------------------------------------------'
     '                    Methods for reading out RX buffer                        '
@@ -446,29 +456,80 @@ class Interface(object):
     
     '-----------------------------------------------------------------------------'
     def RxArray(self, length, dataType):
-        Arr = []
-        for _ in range(length):
-            if   dataType == 1: Arr.append(self.RxU8())
-            elif dataType == -1: Arr.append(self.RxI8()) 
-            elif dataType == 2: Arr.append(self.RxU16())
-            elif dataType == -2: Arr.append(self.RxI16())
-            elif dataType == 4:
-                if type(dataType) is float: Arr.append(self.RxFloat())
-                else: Arr.append(self.RxU32())
-            elif dataType == -4:
-                if type(dataType) is float: Arr.append(self.RxFloat())
-                else: Arr.append(self.RxI32())
-            elif dataType == 8:
-                if type(dataType) is float: Arr.append(self.RxDouble())
-                else: Arr.append(self.RxU64())
-            elif dataType == -8:
-                if type(dataType) is float: Arr.append(self.RxDouble())
-                else: Arr.append(self.RxI64())
-        return Arr
+        'Returns list of length values of dataType (e.g -2 for i16 or 8. for double)'
+        return list(self.RxStruct("%d%s"%(length, datatype_to_char(dataType))))
+    
+    '-----------------------------------------------------------------------------'
+    def RxStruct(self, layout):
+        'Unpacks one record with a layout (format string without byte order or'
+        'precompiled struct.Struct from get_struct) and returns the values as tuple'
+        if not isinstance(layout, struct.Struct):
+            layout = get_struct(layout, self._minBytes)
+        vals = layout.unpack_from(self.__rxBuf, self.__rxRead)
+        self.__rxRead += layout.size
+        return vals
+    
+    '-----------------------------------------------------------------------------'
+    def RxBlock(self, length, dataType, copy=True):
+        'Returns length values of dataType as NumPy array read in one call.'
+        'If copy is True, the array is a copy in native byte order, else it is a'
+        'read-only view into the RX buffer, valid until the buffer is reused.'
+        dt = np.dtype(BYTE_ORDER + datatype_to_char(dataType, self._minBytes))
+        arr = np.frombuffer(self.__rxBuf, dtype=dt, count=length, offset=self.__rxRead)
+        self.__rxRead += length * dt.itemsize
+        if copy:
+            return arr.astype(dt.newbyteorder('='))
+        arr.flags.writeable = False   # frombuffer over the bytearray would be writable
+        return arr
+    
+    '-----------------------------------------------------------------------------'
+    def RxComplexBlock(self, length):
+        'Returns length complex values sent as int16 (real, imag) pairs as new complex64'
+        'array, which does not depend on the RX buffer'
+        return self.RxBlock(2*length, -2, copy=False).astype(np.float32).view(np.complex64)
+    
+    '-----------------------------------------------------------------------------'
+    def RxBlockInto(self, out, dataType):
+        'Reads out.size values of dataType into preallocated array out, converting'
+        'them to its dtype in place. Returns out.'
+        dt = np.dtype(BYTE_ORDER + datatype_to_char(dataType, self._minBytes))
+        arr = np.frombuffer(self.__rxBuf, dtype=dt, count=out.size, offset=self.__rxRead)
+        self.__rxRead += out.size * dt.itemsize
+        np.copyto(out, arr.reshape(out.shape), casting='unsafe')
+        return out
+    
+    '-----------------------------------------------------------------------------'
+    def RxComplexBlockInto(self, out):
+        'Reads out.size complex values sent as int16 (real, imag) pairs into'
+        'preallocated contiguous complex64 array out. Returns out.'
+        self.RxBlockInto(out.view(np.float32).reshape(out.shape + (2,)), -2)
+        return out
         
 '================================================================================='
 '            Methods to convert byte to data types and vise versa                 '
 '================================================================================='
+@lru_cache(maxsize=256)
+def get_struct(fmt, minBytes=1):
+    'Returns precompiled struct.Struct for a record layout given without byte order.'
+    'Recently used layouts are cached; the cache is limited, because array layouts'
+    'depend on the element count. If minBytes > 1, 8-bit values are transferred as'
+    '16-bit values like in TxU8/RxU8.'
+    if minBytes > 1:
+        fmt = fmt.replace('B', 'H').replace('b', 'h')
+    return struct.Struct(BYTE_ORDER + fmt)
+'-----------------------------------------------------------------------------'
+def datatype_to_char(dataType, minBytes=1):
+    'Returns struct format character for dataType (e.g -2 for i16 or 8. for double)'
+    if type(dataType) is float:
+        if abs(dataType) == 4: return 'f'
+        if abs(dataType) == 8: return 'd'
+    elif minBytes > 1 and abs(dataType) == 1:
+        dataType *= 2
+    try:
+        return {1:'B', -1:'b', 2:'H', -2:'h', 4:'I', -4:'i', 8:'Q', -8:'q'}[dataType]
+    except KeyError:
+        raise ValueError("Invalid data type: {}".format(dataType))
+'-----------------------------------------------------------------------------'
 def int8_to_string(val):
         return struct.pack(BYTE_ORDER +'b', val)
 '-----------------------------------------------------------------------------'    
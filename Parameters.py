@@ -94,6 +94,68 @@ NUM_NN_CLASSES = 8
 
 C0 = 299792458  # [m/s]
 
+'==========================================================================='
+class FieldLayout(object):
+    'Declarative layout of a parameter block as sent to or read from the radar.'
+    'Each field is (attribute, format) or (attribute, format, decode, encode) where'
+    'format is a struct format without byte order, e.g. "H" or "4B". Fields with'
+    'more than one value are stored as list unless decode/encode convert them.'
+    'The joined "format" is compiled once by the interface (see get_struct) and'
+    'packed/unpacked with a single call.'
+    def __init__(self, *fields):
+        self.fields = []
+        fmt = ""
+        for field in fields:
+            name, f = field[0], field[1]
+            decode = field[2] if len(field) > 2 else None
+            encode = field[3] if len(field) > 3 else None
+            n = int(f[:-1]) if len(f) > 1 else 1
+            self.fields.append((name, n, decode, encode))
+            fmt += f
+        self.format = fmt
+        
+    '-----------------------------------------------------------------------------'
+    def fromValues(self, obj, values):
+        'Sets attributes of obj from flat sequence of unpacked values'
+        idx = 0
+        for name, n, decode, _ in self.fields:
+            if n == 1:
+                val = values[idx]
+            else:
+                val = list(values[idx:idx+n])
+            if decode is not None:
+                val = decode(val)
+            setattr(obj, name, val)
+            idx += n
+        return obj
+    
+    '-----------------------------------------------------------------------------'
+    def toValues(self, obj):
+        'Returns flat list of values of obj in layout order for packing'
+        values = []
+        for name, n, _, encode in self.fields:
+            val = getattr(obj, name)
+            if encode is not None:
+                val = encode(val)
+            if n == 1:
+                values.append(val)
+            else:
+                values.extend(val)
+        return values
+
+'-----------------------------------------------------------------------------'
+def ipToStr(ip):
+    return str(ip[0]) + "." + str(ip[1]) + "." + str(ip[2]) + "." + str(ip[3])
+
+def ipToList(ip):
+    return [int(n) for n in ip.split(".")]
+
+def ipsToStr(ips):
+    return [ipToStr(ips[n:n+4]) for n in range(0, len(ips), 4)]
+
+def ipsToList(ips):
+    return [val for ip in ips for val in ipToList(ip)]
+
 '==========================================================================='
 class InfoParameters(object):
     def __init__(self):
@@ -116,6 +178,41 @@ class RadarParameters(object):
     MAX_DOPPLER_BIN = 0xFEAC
     NO_DOPPLER_INTERVAL = 0xD000
     
+    # order and types as sent by get/set radar parameters commands
+    LAYOUT = FieldLayout(
+        ("RadarCube", "H"),
+        ("ContinuousMeas", "B"),
+        ("MeasInterval", "H"),
+        ("Processing", "H"),
+        ("RangeWinFunc", "H"),
+        ("DopplerWinFunc", "H"),
+        ("DopplerFftShift", "B"),
+        ("MinRangeBin", "H"),
+        ("MaxRangeBin", "H"),
+        ("MinDopplerBin", "h"),
+        ("MaxDopplerBin", "h"),
+        ("CfarWindowSize", "H"),
+        ("CfarGuardInt", "H"),
+        ("RangeCfarThresh", "H"),
+        ("TriggerThresh", "h"),     # !
+        ("PeakSearchThresh", "H"),
+        ("SuppressStaticTargets", "H"),
+        ("MaxTargets", "H"),
+        ("MaxTracks", "H"),
+        ("MaxHorSpeed", "H"),
+        ("MaxVerSpeed", "H"),
+        ("MaxAccel", "H"),
+        ("MaxRangeError", "H"),
+        ("MinConfirm", "H"),
+        ("TargetSize", "H"),
+        ("MergeLimit", "H"),
+        ("SectorFiltering", "B"),
+        ("SpeedEstimation", "H"),
+        ("DspDopplerProc", "B"),
+        ("RxChannels", "H"),
+        ("CfarSelect", "H"),
+        ("DopplerCfarThresh", "H"))
+    
     def __init__(self):
         # Data acquisition
         self.RadarCube = RCUBE_smpl512_crp128_4rx   # data cube dimension
@@ -278,6 +375,24 @@ class RadarParameters(object):
 class FrontendParameters(object):
     'Base class for frontend parameters. Each frontend should use it.'
     
+    # order and types as sent by get/set frontend parameters commands
+    LAYOUT = FieldLayout(
+        ("MinFrequency", "I"),
+        ("MaxFrequency", "I"),
+        ("SignalType", "H"),
+        ("TxChannelSelection", "H"),
+        ("RxChannelSelection", "H"),
+        ("TxPowerSetting", "h"),
+        ("RxPowerSetting", "h"),
+        ("RampInit", "I"),
+        ("RampTime", "I"),
+        ("RampReset", "I"),
+        ("RampDelay", "I"),
+        ("OptParam1", "h"),
+        ("OptParam2", "h"),
+        ("OptParam3", "h"),
+        ("OptParam4", "h"))
+    
     def __init__(self):
         self.MinFrequency = 0
         self.MaxFrequency = 1
@@ -358,6 +473,23 @@ class FE_Parameters_AWR1243(FrontendParameters):
 '==========================================================================='
 class EthernetParams(object):
     'Object for Ethernet settings of the radar'
+    
+    # order and types as read by get Ethernet configuration command
+    LAYOUT = FieldLayout(
+        ("DHCP", "B"),
+        ("AutoIP", "B"),
+        ("IP", "4B", ipToStr, ipToList),
+        ("TcpPorts", "%dH"%ENET_MAX_TCP_PORTS),
+        ("UdpPorts", "%dH"%ENET_MAX_UDP_PORTS),
+        ("SubnetMask", "4B", ipToStr, ipToList),
+        ("DefaultGateway", "4B", ipToStr, ipToList),
+        ("MulticastGroups", "%dB"%(4*ENET_MAX_MULTICAST_GROUPS), ipsToStr, ipsToList),
+        ("SntpMode", "B"),
+        ("NtpServer", "4B", ipToStr, ipToList),
+        ("UdpMcPort", "H"),
+        ("UdpBcPort", "H"),
+        ("MAC", "6B"))
+    
     def __init__(self):        
         self.MAC = None # readonly
         self.initValues()
@@ -379,10 +511,10 @@ class EthernetParams(object):
     def getIpAsList(self, ip=None):
         if not ip:
             ip = self.IP
-        return [int(n) for n in ip.split(".")]
+        return ipToList(ip)
     
     def getIpAsStr(self, ip):
-        return str(ip[0]) + "." + str(ip[1]) + "." + str(ip[2]) + "." + str(ip[3])
+        return ipToStr(ip)
     
 '==========================================================================='
 'Objects for reading detection and tracking data'
@@ -0,0 +1,79 @@
+"""
+Binary container for raw chirp recordings.
+
+Layout (little-endian):
+    prelude      magic (8 bytes), version (uint16), reserved (uint16), data offset (uint32)
+    header       UTF-8 JSON with the measurement header fields and the record shape,
+                 padded with spaces up to the data offset (a multiple of DATA_ALIGN)
+    records      fixed-size chirp records, see record_dtype
+"""
+import json
+import struct
+import numpy as np
+
+MAGIC = b"DKURAW\r\n"
+VERSION = 1
+DATA_ALIGN = 64
+FILE_EXTENSION = ".bin"
+
+_prelude = struct.Struct("<8sHHI")
+
+
+def record_dtype(channels, samples):
+    """
+    Returns the NumPy dtype of one chirp record.
+
+    Parameters:
+        channels (int): Number of receive channels per chirp.
+        samples (int): Number of samples per channel.
+
+    Returns:
+        numpy.dtype: Structured dtype with fields
+            - host_time: uint64, host time in microseconds since epoch when the chirp was read.
+            - radar_time: uint64, radar timestamp of the chirp.
+            - data: int16 array of shape (channels, samples).
+    """
+    return np.dtype([("host_time", "<u8"), ("radar_time", "<u8"), ("data", "<i2", (channels, samples))])
+
+
+def write_binary_header(file, fields, channels, samples):
+    """
+    Writes prelude and JSON header of a binary recording.
+
+    Parameters:
+        file (file object): File opened in binary write mode, positioned at its start.
+        fields (dict): Measurement header fields, as returned by file_writer.header_fields.
+        channels (int): Number of receive channels per chirp record.
+        samples (int): Number of samples per channel.
+
+    Returns:
+        int: Offset of the first chirp record.
+    """
+    header = json.dumps({"fields": fields, "channels": channels, "samples": samples},
+                        default=str).encode("utf-8")
+    data_offset = -(-(_prelude.size + len(header)) // DATA_ALIGN) * DATA_ALIGN
+    file.write(_prelude.pack(MAGIC, VERSION, 0, data_offset))
+    file.write(header.ljust(data_offset - _prelude.size))
+    return data_offset
+
+
+def read_binary_header(file):
+    """
+    Reads prelude and JSON header of a binary recording.
+
+    Parameters:
+        file (file object): File opened in binary read mode, positioned at its start.
+
+    Returns:
+        tuple: (header, data_offset) where header is the decoded JSON dictionary.
+
+    Raises:
+        ValueError: If the file is not a binary recording or has an unsupported version.
+    """
+    magic, version, _, data_offset = _prelude.unpack(file.read(_prelude.size))
+    if magic != MAGIC:
+        raise ValueError("Not a binary radar recording")
+    if version != VERSION:
+        raise ValueError(f"Unsupported recording version {version}")
+    header = json.loads(file.read(data_offset - _prelude.size).decode("utf-8"))
+    return header, data_offset
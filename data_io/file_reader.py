@@ -0,0 +1,201 @@
+import bisect
+import os
+import re
+import numpy as np
+from data_io.binary_format import FILE_EXTENSION, read_binary_header, record_dtype
+
+# Markers of the text format written by file_writer.write_chirp_to_file
+_CHIRP_START = b'# Chirp Number:'
+_CHIRP_END = b'# --- End of Chirp ---'
+_TIMESTAMP = re.compile(rb'^# Timestamp: (\S+)', re.M)
+_COMMENT = re.compile(rb'^#[^\n]*', re.M)
+
+
+def read_binary_recording(filename):
+    """
+    Reads a binary recording written by record_measurement(file_format="binary").
+
+    Parameters:
+        filename (str): Path of the .bin file.
+
+    Returns:
+        tuple: A tuple containing:
+            - header (dict): "fields" with the measurement header (same labels as the text
+              format), "channels" and "samples" of each chirp record.
+            - records (numpy.ndarray): Structured array with one entry per chirp and the fields
+              host_time (uint64, microseconds since epoch), radar_time (uint64) and
+              data (int16, shape (channels, samples)).
+    """
+    with open(filename, 'rb') as file:
+        header, data_offset = read_binary_header(file)
+        dtype = record_dtype(header["channels"], header["samples"])
+        file.seek(data_offset)
+        records = np.fromfile(file, dtype=dtype)
+    return header, records
+
+
+class MappedRecording:
+    """
+    Memory-mapped binary recording written by record_measurement(file_format="binary").
+    
+    Chirps are zero-copy views into the file, so only the pages of the chirps that are actually
+    used are read from disk. Index or slice the recording like an array of chirps, or select
+    chirps by time with between(). Use it as context manager or call close() when done.
+    
+    Attributes:
+        header (dict): Decoded JSON header, with the measurement header in "fields".
+        records (numpy.memmap): Structured records with host_time, radar_time and data.
+        chirps (numpy.ndarray): View of the samples of all chirps, shape (chirps, channels, samples).
+        host_time (numpy.ndarray): View of the host times in microseconds since epoch.
+        radar_time (numpy.ndarray): View of the radar timestamps.
+    """
+    
+    def __init__(self, filename):
+        """
+        Parameters:
+            filename (str): Path of the .bin file.
+        """
+        with open(filename, 'rb') as file:
+            self.header, data_offset = read_binary_header(file)
+            size = os.fstat(file.fileno()).st_size
+        dtype = record_dtype(self.header["channels"], self.header["samples"])
+        # A partly written last record of an interrupted recording is left out
+        num_records = (size - data_offset) // dtype.itemsize
+        self.records = np.memmap(filename, dtype=dtype, mode='r', offset=data_offset, shape=(num_records,))
+        self.chirps = self.records['data']
+        self.host_time = self.records['host_time']
+        self.radar_time = self.records['radar_time']
+    
+    def __len__(self):
+        return len(self.records)
+    
+    def __getitem__(self, index):
+        """Returns the samples of the chirps at index (int, slice or index array)."""
+        return self.chirps[index]
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        self.close()
+    
+    def close(self):
+        """Releases the mapping. Views taken before stay valid until they are deleted."""
+        self.records = self.chirps = self.host_time = self.radar_time = None
+    
+    def time_slice(self, start=None, stop=None, clock="host"):
+        """
+        Returns the slice of chirps with start <= time < stop.
+        
+        Times are assumed to increase monotonically, so the bounds are found by binary search
+        which only touches a few records of the file.
+        
+        Parameters:
+            start, stop: Bounds, None for open ends. For clock "host" a datetime, ISO string,
+                         numpy.datetime64 or integer microseconds since epoch (datetimes without
+                         time zone are taken as UTC); for clock "radar" radar timestamps.
+            clock (str): "host" to select by host time, "radar" by radar timestamp.
+        
+        Returns:
+            slice: Slice of chirp indices.
+        """
+        times = self.host_time if clock == "host" else self.radar_time
+        
+        def position(value, default):
+            if value is None:
+                return default
+            if clock == "host" and not isinstance(value, (int, np.integer)):
+                value = np.datetime64(value, 'us').astype(np.int64)
+            return bisect.bisect_left(times, int(value))
+        
+        return slice(position(start, 0), position(stop, len(times)))
+    
+    def between(self, start=None, stop=None, clock="host"):
+        """Returns a view of the chirps with start <= time < stop, see time_slice."""
+        return self.chirps[self.time_slice(start, stop, clock)]
+
+
+def read_text_recording(filename, chunk_size=1 << 24):
+    """
+    Reads a text recording written by record_measurement(file_format="text") in a single pass.
+    
+    The file is read in chunks cut at chirp boundaries. All sample values of a chunk are parsed by
+    one NumPy call into a preallocated int16 array, so no Python work is done per sample line.
+    
+    Parameters:
+        filename (str): Path of the .txt file.
+        chunk_size (int): Number of bytes read at once.
+    
+    Returns:
+        tuple: A tuple containing:
+            - header (dict): Header labels mapped to their values as strings, including "Comments".
+            - chirps (numpy.ndarray): int16 array of shape (chirps, channels, samples).
+            - timestamps (numpy.ndarray): datetime64[us] host timestamp of each chirp.
+    """
+    header = {}
+    timestamps = []
+    chirps = None   # preallocated (chirps, samples, channels), grown if the estimate is too small
+    num_chirps = 0
+    with open(filename, 'rb') as file:
+        # Header lines up to the first chirp
+        rest = b''
+        for line in file:
+            if line.startswith(_CHIRP_START):
+                rest = line
+                break
+            label, _, value = line[1:].decode().strip().partition(': ')
+            if value or label == "Comments:":
+                header[label.rstrip(':')] = value
+        
+        while rest:
+            block = file.read(chunk_size)
+            data = rest + block
+            end = data.rfind(_CHIRP_END)
+            if end < 0:
+                if not block:
+                    break   # incomplete last chirp
+                rest = data
+                continue
+            end += len(_CHIRP_END)
+            part, rest = data[:end], data[end:]
+            if not block:
+                rest = b''
+            
+            if chirps is None:
+                # Shape from the first chirp, number of chirps estimated from the file size
+                first = part[:part.find(_CHIRP_END)]
+                rows = [row for row in _COMMENT.sub(b'', first).splitlines() if row.strip()]
+                channels = rows[0].count(b',') + 1
+                samples = len(rows)
+                size = os.fstat(file.fileno()).st_size
+                chirps = np.empty((size // max(len(first), 1) + 1, samples, channels), dtype=np.int16)
+            
+            n = part.count(_CHIRP_END)
+            if num_chirps + n > len(chirps):
+                chirps = np.concatenate((chirps, np.empty((num_chirps + n,) + chirps.shape[1:], dtype=np.int16)))
+            values = np.fromstring(_COMMENT.sub(b'', part).replace(b',', b' '), dtype=np.int16, sep=' ')
+            chirps[num_chirps:num_chirps + n] = values.reshape((n,) + chirps.shape[1:])
+            num_chirps += n
+            timestamps += _TIMESTAMP.findall(part)
+    
+    if chirps is None:
+        chirps = np.empty((0, 0, 0), dtype=np.int16)
+    chirps = chirps[:num_chirps].transpose(0, 2, 1)
+    return header, chirps, np.array([t.decode() for t in timestamps], dtype='datetime64[us]')
+
+
+def load_recording(filename):
+    """
+    Loads a whole recording, text or binary, into one array.
+    
+    Parameters:
+        filename (str): Path of a .txt or .bin recording.
+    
+    Returns:
+        tuple: (header, chirps, timestamps) as returned by read_text_recording. For binary files
+               the header values keep their types and timestamps are the host times.
+    """
+    if filename.endswith(FILE_EXTENSION):
+        header, records = read_binary_recording(filename)
+        return header["fields"], records['data'], records['host_time'].astype('datetime64[us]')
+    return read_text_recording(filename)
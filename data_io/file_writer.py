@@ -1,6 +1,65 @@
 import datetime
+import queue
+import threading
+import time
+import numpy as np
 from Communication import Commands
 from radar import radar
+from data_io.binary_format import FILE_EXTENSION, record_dtype, write_binary_header
+
+def header_fields(radar_frequency, site_name, radar_angle, measure_id, polarization, infoParams, frontendParams, radarParams, sensor_temp, additional_info=None):
+    """
+    Collects the measurement header fields shared by the text and the binary recording format.
+    
+    Parameters:
+        Same as write_header, without the file.
+    
+    Returns:
+        dict: Header labels mapped to their values, in the order they are written to text files.
+              The last entry is "Comments" with additional_info.
+    """
+    timestamp = datetime.datetime.now().isoformat()
+    return {
+        "Radar Frequency": radar_frequency,
+        "Site Name": site_name,
+        "Radar Angle": radar_angle,
+        "Measurement ID": measure_id,
+        "Polarization": polarization,
+        "Timestamp": timestamp,
+        
+        # Device and firmware parameters
+        "Device Number": infoParams.deviceNumber,
+        "Frontend Connected": infoParams.frontendConnected,
+        "Firmware Version": infoParams.fwVersion,
+        "Firmware Revision": infoParams.fwRevision,
+        "Firmware Date": infoParams.fwDate,
+        
+        # Frontend parameters
+        "Min Frequency": frontendParams.MinFrequency,
+        "Max Frequency": frontendParams.MaxFrequency,
+        "Signal Type": frontendParams.SignalType,
+        "TX Channel Selection": frontendParams.TxChannelSelection,
+        "RX Channel Selection": frontendParams.RxChannelSelection,
+        "TX Power Setting": frontendParams.TxPowerSetting,
+        "RX Power Setting": frontendParams.RxPowerSetting,
+        "Ramp Init": frontendParams.RampInit,
+        "Ramp Time": frontendParams.RampTime,
+        "Ramp Reset": frontendParams.RampReset,
+        "Ramp Delay": frontendParams.RampDelay,
+        "Sensor temperature": sensor_temp,
+        
+        # Radar parameters
+        "Radar Cube": radarParams.RadarCube,
+        "Processing": radarParams.Processing,
+        "Range Window Function": radarParams.RangeWinFunc,
+        "Min Range Bin": radarParams.MinRangeBin,
+        "Max Range Bin": radarParams.MaxRangeBin,
+        "Trigger Threshold": radarParams.TriggerThresh,
+        "RX Channels": radarParams.RxChannels,
+        
+        "Comments": additional_info,
+    }
+
 
 def write_header(file, radar_frequency, site_name, radar_angle, measure_id, polarization, infoParams, frontendParams, radarParams, sensor_temp, additional_info=None):
     """
@@ -20,47 +79,13 @@ def write_header(file, radar_frequency, site_name, radar_angle, measure_id, pola
     
     """
     
-    # Get radar informations
-
+    fields = header_fields(radar_frequency, site_name, radar_angle, measure_id, polarization,
+                           infoParams, frontendParams, radarParams, sensor_temp, additional_info)
+    additional_info = fields.pop("Comments")
     
-    timestamp = datetime.datetime.now().isoformat()
     file.write("# === Measurement Header ===\n")
-    file.write(f"# Radar Frequency: {radar_frequency}\n")
-    file.write(f"# Site Name: {site_name}\n")
-    file.write(f"# Radar Angle: {radar_angle}\n")
-    file.write(f"# Measurement ID: {measure_id}\n")
-    file.write(f"# Polarization: {polarization}\n")
-    file.write(f"# Timestamp: {timestamp}\n")
-    
-    # Device and firmware parameters
-    file.write(f"# Device Number: {infoParams.deviceNumber}\n")
-    file.write(f"# Frontend Connected: {infoParams.frontendConnected}\n")
-    file.write(f"# Firmware Version: {infoParams.fwVersion}\n")
-    file.write(f"# Firmware Revision: {infoParams.fwRevision}\n")
-    file.write(f"# Firmware Date: {infoParams.fwDate}\n")
-    
-    # Frontend parameters
-    file.write(f"# Min Frequency: {frontendParams.MinFrequency}\n")
-    file.write(f"# Max Frequency: {frontendParams.MaxFrequency}\n")
-    file.write(f"# Signal Type: {frontendParams.SignalType}\n")
-    file.write(f"# TX Channel Selection: {frontendParams.TxChannelSelection}\n")
-    file.write(f"# RX Channel Selection: {frontendParams.RxChannelSelection}\n")
-    file.write(f"# TX Power Setting: {frontendParams.TxPowerSetting}\n")
-    file.write(f"# RX Power Setting: {frontendParams.RxPowerSetting}\n")
-    file.write(f"# Ramp Init: {frontendParams.RampInit}\n")
-    file.write(f"# Ramp Time: {frontendParams.RampTime}\n")
-    file.write(f"# Ramp Reset: {frontendParams.RampReset}\n")
-    file.write(f"# Ramp Delay: {frontendParams.RampDelay}\n")
-    file.write(f"# Sensor temperature: {sensor_temp}\n")
-    
-    # Radar parameters
-    file.write(f"# Radar Cube: {radarParams.RadarCube}\n")
-    file.write(f"# Processing: {radarParams.Processing}\n")
-    file.write(f"# Range Window Function: {radarParams.RangeWinFunc}\n")
-    file.write(f"# Min Range Bin: {radarParams.MinRangeBin}\n")
-    file.write(f"# Max Range Bin: {radarParams.MaxRangeBin}\n")
-    file.write(f"# Trigger Threshold: {radarParams.TriggerThresh}\n")
-    file.write(f"# RX Channels: {radarParams.RxChannels}\n")
+    for label, value in fields.items():
+        file.write(f"# {label}: {value}\n")
 
     file.write("# ==========================\n\n")
     file.write(f"# Comments: {additional_info}\n")
@@ -80,16 +105,115 @@ def write_chirp_to_file(file, chirp_number, timestamp, data):
         file (file object): Open file object to write to.
         chirp_number (int): Chirp number within the measurement.
         timestamp (str): Timestamp for the chirp.
-        data (list of lists): 4x1024 matrix data for the chirp.
+        data (dict): Chirp as returned by CMD_READ_RAW_DATA, where data['data'] is either
+            a dict of 4 lists of 1024 values or a (4, 1024) NumPy array.
     """
+    channels = data['data']
+    if hasattr(channels, 'tolist'):
+        # NumPy array: convert once to Python ints, which format much faster than NumPy scalars
+        channels = channels.tolist()
     file.write(f"# Chirp Number: {chirp_number}\n")
     file.write(f"# Timestamp: {timestamp}\n")
-    for row in zip(data['data'][0], data['data'][1], data['data'][2], data['data'][3]):
+    for row in zip(channels[0], channels[1], channels[2], channels[3]):
         file.write(', '.join(map(str, row)) + "\n")
     file.write("# --- End of Chirp ---\n\n")
 
 
-def record_measurement(num_records=50, foldername="./data/", measure_number=1, options=None):
+def write_binary_records(file, dtype, frames):
+    """
+    Writes a batch of chirps as binary records with a single write call.
+    
+    Parameters:
+        file (file object): Binary file opened for writing, positioned after the header.
+        dtype (numpy.dtype): Record dtype from binary_format.record_dtype.
+        frames (list): Tuples (host_time, radar_time, data) with data of shape (channels, samples).
+    """
+    records = np.empty(len(frames), dtype=dtype)
+    for n, frame in enumerate(frames):
+        records[n] = frame
+    file.write(records.data)
+
+
+class RecordingWriter:
+    """
+    Writes frames to disk on a background thread, so disk writes do not delay the next radar read.
+    
+    The acquisition loop puts frames into a bounded queue. The writer thread takes all queued
+    frames (up to batch_size) at once and passes them to write_batch. If the disk falls behind,
+    put() blocks until there is space again; these waits are counted in the statistics. close()
+    writes all remaining frames and flushes the file.
+    """
+    
+    def __init__(self, file, write_batch, max_queue=64, batch_size=16):
+        """
+        Parameters:
+            file (file object): Open file the frames are written to, flushed on close().
+            write_batch (callable): Function write_batch(frames) writing a list of frames to file.
+            max_queue (int): Maximum number of frames waiting to be written.
+            batch_size (int): Maximum number of frames per write_batch call.
+        """
+        self.file = file
+        self.write_batch = write_batch
+        self.batch_size = batch_size
+        self.error = None
+        self.stats = {"frames": 0, "batches": 0, "max_queued": 0, "blocked_puts": 0, "blocked_time": 0.0}
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._thread = threading.Thread(target=self._run, name="RecordingWriter", daemon=True)
+        self._thread.start()
+    
+    def put(self, frame):
+        """
+        Queues a frame for writing. The frame must not be modified afterwards, so copy data that
+        views a reused buffer (like the raw data array of CMD_READ_RAW_DATA) before.
+        """
+        if self.error is not None:
+            raise self.error
+        try:
+            self._queue.put_nowait(frame)
+        except queue.Full:
+            # Back-pressure: the disk is slower than the radar
+            t_start = time.perf_counter()
+            self._queue.put(frame)
+            self.stats["blocked_puts"] += 1
+            self.stats["blocked_time"] += time.perf_counter() - t_start
+        self.stats["max_queued"] = max(self.stats["max_queued"], self._queue.qsize())
+    
+    def close(self):
+        """
+        Writes all queued frames, flushes the file and ends the writer thread.
+        
+        Returns:
+            dict: Statistics (frames, batches, max_queued, blocked_puts, blocked_time in s).
+        
+        Raises:
+            Exception: The error that stopped the writer thread, if any.
+        """
+        self._queue.put(None)
+        self._thread.join()
+        self.file.flush()
+        if self.error is not None:
+            raise self.error
+        return self.stats
+    
+    def _run(self):
+        done = False
+        while not done:
+            batch = [self._queue.get()]
+            while len(batch) < self.batch_size and not self._queue.empty():
+                batch.append(self._queue.get())
+            if batch[-1] is None:
+                batch.pop()
+                done = True
+            if batch and self.error is None:
+                try:
+                    self.write_batch(batch)
+                    self.stats["frames"] += len(batch)
+                    self.stats["batches"] += 1
+                except Exception as e:
+                    self.error = e
+
+
+def record_measurement(num_records=50, foldername="./data/", measure_number=1, options=None, file_format="text"):
     """
     Records a measurement consisting of `num_records` chirps, writing both header and chirp data.
     
@@ -106,6 +230,9 @@ def record_measurement(num_records=50, foldername="./data/", measure_number=1, o
             - radarParams (RadarParameters): Radar measurement and processing parameters.
             - polarization (str): Polarization type for the measurement (e.g., "Vertical" or "Horizontal").
             - additional_info (dict): Any extra metadata for the header.
+        file_format (str): "text" writes the commented text format (.txt), "binary" the binary
+            container of data_io/binary_format.py (.bin) with the same header fields and one
+            fixed-size int16 record per chirp. Binary files are read with data_io.file_reader.
     """
     # Set options to an empty dictionary if None is provided
     if options is None:
@@ -113,7 +240,7 @@ def record_measurement(num_records=50, foldername="./data/", measure_number=1, o
 
     # Extract parameters from options with defaults if they aren't provided
     cmd = options.get("cmd")
-    sensor_temp = cmd.executeCmd(Commands.CMD_GET_FE_SENSORS)
+    sensor_temp = cmd.executeCached(Commands.CMD_GET_FE_SENSORS)
     sensor_temp = sensor_temp["FeSensor_1"]
     site_name = options.get("site_name")
     measure_id = options.get("measure_id")
@@ -133,26 +260,65 @@ def record_measurement(num_records=50, foldername="./data/", measure_number=1, o
     elif frontendParams.MinFrequency == 16500000:
         radar_frequency = '17GHz'
         
-    filename = radar_frequency + '_' + site_name + '_' + str(measure_id) + '_' + polarization + '_' + radar_angle + 'deg.txt'
-    
-    with open(foldername + filename, 'w') as file:
-        # Write the header for this measurement
-        write_header(
-            file, radar_frequency=radar_frequency, site_name=site_name,
-            radar_angle=radar_angle, measure_id=measure_number, 
-            polarization=polarization, infoParams=infoParams, 
-            frontendParams=frontendParams, radarParams=radarParams, 
-            additional_info=additional_info,sensor_temp=sensor_temp,
-        )
-        
-        # Record and write each chirp
-        for chirp_number in range(1, num_records + 1):
-            
-            timestamp = datetime.datetime.now().isoformat()
-            
-            data = cmd.executeCmd(Commands.CMD_READ_RAW_DATA)
-            write_chirp_to_file(file,chirp_number=chirp_number, timestamp=timestamp, data=data)
-            
+    filename = radar_frequency + '_' + site_name + '_' + str(measure_id) + '_' + polarization + '_' + radar_angle + 'deg'
+    
+    filename += FILE_EXTENSION if file_format == "binary" else '.txt'
+    with open(foldername + filename, 'wb' if file_format == "binary" else 'w') as file:
+        if file_format == "binary":
+            fields = header_fields(
+                radar_frequency=radar_frequency, site_name=site_name,
+                radar_angle=radar_angle, measure_id=measure_number, 
+                polarization=polarization, infoParams=infoParams, 
+                frontendParams=frontendParams, radarParams=radarParams, 
+                additional_info=additional_info, sensor_temp=sensor_temp,
+            )
+            channels = radarParams.getNumActiveRxChan()
+            samples = radarParams._NumSamples
+            write_binary_header(file, fields, channels, samples)
+            dtype = record_dtype(channels, samples)
+            writer = RecordingWriter(file, lambda frames: write_binary_records(file, dtype, frames))
+        else:
+            # Write the header for this measurement
+            write_header(
+                file, radar_frequency=radar_frequency, site_name=site_name,
+                radar_angle=radar_angle, measure_id=measure_number, 
+                polarization=polarization, infoParams=infoParams, 
+                frontendParams=frontendParams, radarParams=radarParams, 
+                additional_info=additional_info,sensor_temp=sensor_temp,
+            )
+            def write_text_chirps(frames):
+                for chirp_number, timestamp, data in frames:
+                    write_chirp_to_file(file, chirp_number=chirp_number, timestamp=timestamp, data={'data': data})
+            writer = RecordingWriter(file, write_text_chirps)
 
-    print(f"Measurement {measure_number} recorded to {filename}")
+        try:
+            # Record each chirp, the writer thread writes them meanwhile
+            read_raw_data = cmd.resolveCmd(Commands.CMD_READ_RAW_DATA)
+            for chirp_number in range(1, num_records + 1):
+                
+                timestamp = datetime.datetime.now().isoformat()
+                
+                # The raw data array views the RX buffer, so copy it (little-endian as in files)
+                # before another thread, e.g. an acquisition worker, can run a command
+                with cmd.lock:
+                    data = cmd.executeResolved(read_raw_data, asArray=True)
+                    samples = data['data'].astype('<i2')
+                    radar_time = data['time']
+                if file_format == "binary":
+                    writer.put((time.time_ns() // 1000, radar_time, samples))
+                else:
+                    writer.put((chirp_number, timestamp, samples))
+        except BaseException as error:
+            # Write what was recorded, but report the error of the acquisition, not of the writer
+            try:
+                writer.close()
+            except Exception as writer_error:
+                if writer_error is not error:
+                    print(f"Writing measurement {measure_number} failed as well: {writer_error}")
+            raise
+        stats = writer.close()
 
+    print(f"Measurement {measure_number} recorded to {filename}")
+    if stats["blocked_puts"]:
+        print(f"Writer was behind {stats['blocked_puts']} times, acquisition waited {stats['blocked_time']:.3f} s in total")
+    return stats
@@ -0,0 +1,156 @@
+"""
+Headless acquisition for unattended stations.
+
+Initializes the radars and records a measurement from each of them at a fixed interval,
+without any display and without importing matplotlib. Settings are given as command line
+flags or as a JSON config file whose keys are the flag names with underscores, e.g.
+
+    {"radars": ["192.168.0.13:4100", "192.168.0.17:4101"], "interval": 600,
+     "records": 150, "file_format": "binary", "site_name": "station1"}
+
+Flags given on the command line override the config file, --radar flags replace its radars.
+
+Usage:
+    python headless.py --config station.json
+    python headless.py --radar 192.168.0.13:4100 --interval 300 --count 12
+"""
+import argparse
+import datetime
+import json
+import os
+import sys
+import threading
+import time
+from radar.radar import init_radar, close_radar
+from data_io.file_writer import record_measurement
+
+DEFAULT_RADARS = ["192.168.0.13:4100", "192.168.0.17:4101"]
+
+
+def parse_args(argv=None):
+    """Parses the command line, using the values of the --config file as defaults."""
+    config_parser = argparse.ArgumentParser(add_help=False)
+    config_parser.add_argument("--config", help="JSON file with default settings")
+    config_args, _ = config_parser.parse_known_args(argv)
+
+    parser = argparse.ArgumentParser(description="Record radar measurements at a fixed interval without display.",
+                                     parents=[config_parser])
+    parser.add_argument("--radar", action="append", default=None,
+                        help="radar as IP[:host port], repeat for several radars (default: both station radars)")
+    parser.add_argument("--interval", type=float, default=600.0, help="seconds between measurement starts")
+    parser.add_argument("--count", type=int, default=0, help="number of measurements, 0 runs until interrupted")
+    parser.add_argument("--records", type=int, default=150, help="chirps per measurement")
+    parser.add_argument("--output", default="./data/", help="folder for the recordings")
+    parser.add_argument("--file-format", choices=("text", "binary"), default="text", help="recording format")
+    parser.add_argument("--site-name", default="", help="site name written to the header and file name")
+    parser.add_argument("--radar-angle", default="0", help="radar angle in degrees")
+    parser.add_argument("--polarization", default="Vertical", help="measurement polarization")
+    parser.add_argument("--comments", default="", help="comments written to the header")
+    config = {}
+    if config_args.config:
+        with open(config_args.config) as file:
+            config = json.load(file)
+    # "radars" as in the example above, "radar" like the flag, a list or a single radar
+    config_radars = config.pop("radars", None) or config.pop("radar", None)
+    config.pop("radar", None)
+    if isinstance(config_radars, str):
+        config_radars = [config_radars]
+    # Config values go through the parser as flags placed before the command line ones, so they
+    # are converted and checked like these and the command line overrides them
+    config_argv = []
+    for key, value in config.items():
+        if value is not None:
+            config_argv.append(f"--{key.replace('_', '-')}={value}")  # "=" keeps values like "-5" apart from flags
+    args = parser.parse_args(config_argv + list(argv if argv is not None else sys.argv[1:]))
+    if args.interval <= 0:
+        parser.error("--interval must be greater than 0")
+    # Radars given on the command line replace those of the config file
+    args.radars = args.radar or config_radars or DEFAULT_RADARS
+    return args
+
+
+def connect_radars(radars):
+    """
+    Initializes every radar given as "IP[:host port]".
+
+    Returns:
+        list: (ip, com, cmd) of the radars that were initialized successfully.
+    """
+    connected = []
+    for radar in radars:
+        ip, _, host_port = radar.partition(':')
+        com, cmd, ok = init_radar(ip, host_port=int(host_port or 4100))
+        if ok:
+            print(f"Radar connected at IP address {ip}")
+            connected.append((ip, com, cmd))
+        else:
+            print(f"Failed to connect radar at IP address {ip}")
+            close_radar(com)
+    return connected
+
+
+def record_all(connected, args, measure_number):
+    """Records one measurement from each radar, all radars at the same time on their own threads."""
+    # Time stamp and number in the measure id keep the file names of all measurements apart
+    measure_id = datetime.datetime.now().strftime("%Y%m%dT%H%M%S") + f"-{measure_number}"
+    errors = []
+
+    def record(ip, cmd):
+        options = {
+            "cmd": cmd,
+            "site_name": args.site_name,
+            "measure_id": measure_id,
+            "radar_angle": args.radar_angle,
+            "polarization": args.polarization,
+            "additional_info": args.comments,
+        }
+        try:
+            record_measurement(num_records=args.records, foldername=args.output,
+                               measure_number=measure_number, options=options, file_format=args.file_format)
+        except Exception as e:
+            errors.append(e)
+            print(f"Measurement {measure_number} of radar {ip} failed: {e}")
+
+    recorders = [threading.Thread(target=record, args=(ip, cmd)) for ip, _, cmd in connected]
+    for recorder in recorders:
+        recorder.start()
+    for recorder in recorders:
+        recorder.join()
+    return not errors
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    os.makedirs(args.output, exist_ok=True)
+    connected = connect_radars(args.radars)
+    if not connected:
+        print("Failed to initialize any radar. Exiting...")
+        return 1
+
+    measure_number = 0
+    next_start = time.monotonic()
+    try:
+        while args.count <= 0 or measure_number < args.count:
+            measure_number += 1
+            t_start = time.monotonic()
+            ok = record_all(connected, args, measure_number)
+            print(f"Measurement {measure_number} {'done' if ok else 'incomplete'} "
+                  f"in {time.monotonic() - t_start:.1f} s")
+            if args.count > 0 and measure_number >= args.count:
+                break
+            # Keep a fixed cadence; intervals missed by an overlong measurement are skipped
+            next_start += args.interval
+            now = time.monotonic()
+            if next_start < now:
+                next_start += -(-(now - next_start) // args.interval) * args.interval
+            time.sleep(next_start - now)
+    except KeyboardInterrupt:
+        print("Stopped")
+    finally:
+        for _, com, _ in connected:
+            close_radar(com)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,20 +1,22 @@
 import threading
 import time
-from radar.radar import init_radar, fetch_radar_data, close_radar
-from plotting.plotting import init_plot, update_plot, update_record_plot
-import matplotlib.pyplot as plt
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from radar.radar import init_radar, fetch_radar_data, fetch_radar_pair, close_radar
+from radar.acquisition import AcquisitionWorker
+from plotting.scheduler import DisplayScheduler
 from data_io.file_writer import record_measurement
 from queue import Queue
-import matplotlib
 import os
 os.environ["QT_QPA_PLATFORM"] = "xcb"
 
-matplotlib.use("TkAgg")
 # Global flags and settings
 running = False  # Controls display running state
+acq_workers = []  # Acquisition workers of the connected radars, running while the display runs
 recording_lock = threading.Lock()
 plot_update_queue = Queue()
 num_record_=150
+DISPLAY_FPS = 20  # Refresh rate of the live display, independent of the acquisition rate
 # def main():
 #     global running
 
@@ -55,9 +57,15 @@ def main():
     radar1_host_port = 4100
     radar2_host_port = 4101
 
+    # Load the display modules in the background while the radars are initialized
+    display_loader = threading.Thread(target=load_display, daemon=True)
+    display_loader.start()
+
     # Initialize each radar
     com1, cmd1, ok1 = init_radar(radar1_ip, host_port=radar1_host_port)
     com2, cmd2, ok2 = init_radar(radar2_ip, host_port=radar2_host_port)
+    display_loader.join()
+    from plotting.plotting import BlitRenderer, init_plot
 
     # Check each radar's connection status and print the IP of connected radars
     if ok1 and ok2:
@@ -84,80 +92,90 @@ def main():
     # Initialize the plot
     #fig, ax, lines = init_plot(("13GHz", "17GHz"), two_radar=True)
 
+    # Create one acquisition worker per connected radar, fetching while the display runs
+    worker1 = AcquisitionWorker(cmd1, name="13GHz") if com1 else None
+    worker2 = AcquisitionWorker(cmd2, name="17GHz") if com2 else None
+    for worker in (worker1, worker2):
+        if worker:
+            worker.start()
+            acq_workers.append(worker)
+
     # Start the keyboard listener in the background
     keyboard_thread = threading.Thread(target=keyboard_listener, args=(cmd1, cmd2, com1,com2,ax, dashlines))
     keyboard_thread.daemon = True
     keyboard_thread.start()
 
-    # Run the display update on the main thread
-    update_display(ax, lines, cmd1, cmd2, com1,com2)
+    # Run the display update on the main thread, redrawing only the live lines per frame
+    renderer = BlitRenderer(fig, lines)
+    update_display(ax, lines, worker1, worker2, renderer)
 
     # Clean up
+    for worker in acq_workers:
+        worker.stop()
     close_radar(com1)
     close_radar(com2)
 
+def load_display():
+    """
+    Imports matplotlib with the Tk backend and the plotting module. Not done at module import,
+    so that headless use of this module and radar reconnection do not wait for matplotlib.
+    """
+    import matplotlib
+    matplotlib.use("TkAgg")
+    import plotting.plotting
+
 def process_plot_updates():
+    from plotting.plotting import update_record_plot
     while not plot_update_queue.empty():
         update_type, ax, dashlines, *data = plot_update_queue.get()
         if update_type == "update_record":
             update_record_plot(ax, dashlines, *data)
-    plt.pause(0.05)
 
-def update_display(ax, lines, cmd1, cmd2, com1,com2):
+def frame_profiles(frame):
+    """Returns the co- and cross-polar magnitudes of the first 100 range bins of a ring frame."""
+    _, _, data = frame
+    return np.abs(data[0][0:100]), np.abs(data[1][0:100])
+
+def update_display(ax, lines, worker1, worker2, renderer=None):
+    """
+    Draws the newest frame of each acquisition worker at DISPLAY_FPS while the display is
+    running. Frames fetched in between are dropped and counted as skipped.
+    """
     global running
-    while True:
-        if running:
+    import matplotlib.pyplot as plt
+    from plotting.plotting import update_plot
+    scheduler = DisplayScheduler(DISPLAY_FPS, idle=plt.pause)
+    try:
+        while True:
+            scheduler.wait()
+            if not running:
+                continue
+            frame1 = worker1.ring.latest() if worker1 else None
+            frame2 = worker2.ring.latest() if worker2 else None
+            new1 = scheduler.take("13GHz", frame1[0] if frame1 else None)
+            new2 = scheduler.take("17GHz", frame2[0] if frame2 else None)
+
+            # Redraw only if a worker delivered a new frame
+            if new1 or new2:
+                if worker1 and worker2:
+                    if frame1 and frame2:
+                        rx_values1_copol, rx_values1_crosspol = frame_profiles(frame1)
+                        rx_values2_copol, rx_values2_crosspol = frame_profiles(frame2)
+                        update_plot(ax, lines, rx_values1_copol, rx_values1_crosspol, 
+                                two_radar=True, rx_values2_copol=rx_values2_copol, 
+                                rx_values2_crosspol=rx_values2_crosspol, renderer=renderer)
+                        scheduler.frame_drawn()
+                else:
+                    rx_values_copol, rx_values_crosspol = frame_profiles(frame1 or frame2)
+                    update_plot(ax, lines, rx_values_copol, rx_values_crosspol, 
+                            two_radar=False, renderer=renderer)
+                    scheduler.frame_drawn()
 
-            
-            if com1 and com2:
-                
-                data1 = fetch_radar_data(cmd1)
-                data2 = fetch_radar_data(cmd2)
-                rx_values1_copol = [abs(item) for item in data1['data'][0]][0:100]
-                rx_values1_crosspol = [abs(item) for item in data1['data'][1]][0:100]
-                rx_values2_copol = [abs(item) for item in data2['data'][0]][0:100]
-                rx_values2_crosspol = [abs(item) for item in data2['data'][1]][0:100]
-                
-                update_plot(ax, lines, rx_values1_copol, rx_values1_crosspol, 
-                        two_radar=True, rx_values2_copol=rx_values2_copol, 
-                        rx_values2_crosspol=rx_values2_crosspol)
-
-                
-            elif com1 and not com2:
-                data1 = fetch_radar_data(cmd1)
-                            # Process data for each radar
-                rx_values1_copol = [abs(item) for item in data1['data'][0]][0:100]
-                rx_values1_crosspol = [abs(item) for item in data1['data'][1]][0:100]
-                
-                update_plot(ax, lines, rx_values1_copol, rx_values1_crosspol, 
-                        two_radar=False)
-                
-            elif com2 and not com1:
-                data2 = fetch_radar_data(cmd2)
-                rx_values2_copol = [abs(item) for item in data2['data'][0]][0:100]
-                rx_values2_crosspol = [abs(item) for item in data2['data'][1]][0:100]
-                
-                update_plot(ax, lines, rx_values2_copol, rx_values2_crosspol, 
-                        two_radar=False)
-                
-            # Fetch and process data
-            # data1 = fetch_radar_data(cmd1)
-            # data2 = fetch_radar_data(cmd2)
-            # Process data for each radar
-            # rx_values1_copol = [abs(item) for item in data1['data'][0]][0:100]
-            # rx_values1_crosspol = [abs(item) for item in data1['data'][1]][0:100]
-            # rx_values2_copol = [abs(item) for item in data2['data'][0]][0:100]
-            # rx_values2_crosspol = [abs(item) for item in data2['data'][1]][0:100]
-
-            # Update plot
-            # update_plot(ax, lines, rx_values1_copol, rx_values1_crosspol, 
-            #             two_radar=True, rx_values2_copol=rx_values2_copol, 
-            #             rx_values2_crosspol=rx_values2_crosspol)
             process_plot_updates()
-            plt.pause(0.02)
-# Increment chirp count
-        else:
-            plt.pause(0.1)
+    finally:
+        stats = scheduler.stats
+        print(f"Display: {stats['shown']} frames drawn at {stats['fps']:.1f} fps, "
+              f"{stats['skipped']} frames skipped")
 
 def keyboard_listener(cmd1, cmd2, com1,com2,ax, dashlines):
     """Listen for keyboard events to control display and take measurements."""
@@ -199,6 +217,12 @@ def toggle_display():
     """Toggles the display between running and paused."""
     global running
     running = not running
+    # Acquire only while displaying, so recordings have the radars to themselves
+    for worker in acq_workers:
+        if running:
+            worker.resume()
+        else:
+            worker.pause()
     print("Display toggled:", "Running" if running else "Paused")
 
 def gather_recording_info():
@@ -240,11 +264,26 @@ def take_measurement(cmd, radar_label,ax, dashlines, measure_type=None):
             }
             options_1.update(recording_info)
             options_2.update(recording_info)
-            record_measurement(num_records=num_record_, foldername="./data/", measure_number=1, options=options_1)
-            record_measurement(num_records=num_record_, foldername="./data/", measure_number=1, options=options_2)
-            
-            data1 = fetch_radar_data(cmd[0])
-            data2 = fetch_radar_data(cmd[1])
+            # Record both radars at the same time, each on its own thread
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                recorders = [executor.submit(record_measurement, num_records=num_record_, foldername="./data/",
+                                             measure_number=1, options=options)
+                             for options in (options_1, options_2)]
+            failed = False
+            for label, recorder in zip(("13GHz", "17GHz"), recorders):
+                try:
+                    recorder.result()
+                except Exception as e:
+                    print(f"Recording of radar {label} failed: {e}")
+                    failed = True
+            if failed:
+                return
+
+            pair = fetch_radar_pair(cmd[0], cmd[1])
+            if pair is None:
+                print("Failed to fetch data of both radars, recorded data not shown.")
+                return
+            data1, data2 = pair["data1"], pair["data2"]
             rx_values1_copol = [abs(item) for item in data1['data'][0]][0:100]
             rx_values1_crosspol = [abs(item) for item in data1['data'][1]][0:100]
             rx_values2_copol = [abs(item) for item in data2['data'][0]][0:100]
@@ -1,4 +1,5 @@
 import matplotlib.pyplot as plt
+import numpy as np
 
 def init_plot(radar_wavelength, two_radar=False):
     """
@@ -78,8 +79,70 @@ def init_plot(radar_wavelength, two_radar=False):
         ax.legend()
         
         return fig, ax, (line_copol, line_crosspol), (dashline_copol, dashline_crosspol)
-    
-def update_plot(ax, lines, rx_values_copol, rx_values_crosspol, two_radar=False, rx_values2_copol=None, rx_values2_crosspol=None):
+
+class BlitRenderer:
+    """
+    Redraws only the live lines of a figure on top of a cached background.
+
+    The live lines are made animated, so a full draw renders axes, ticks, legends and the
+    recorded (dashed) lines only. The result is cached on every draw event (first show,
+    resize, update_record_plot) and each frame restores it and draws just the live lines.
+    Limits set by init_plot are kept; an axis is only rescaled, with a full redraw, when the
+    data exceeds its limits.
+    """
+
+    def __init__(self, fig, lines, margin=1.1):
+        """
+        Parameters:
+            fig (Figure): The figure returned by init_plot.
+            lines (tuple): The live lines returned by init_plot, for one or two radars.
+            margin (float): Factor by which a limit is extended beyond the data when rescaling.
+        """
+        self.fig = fig
+        self.canvas = fig.canvas
+        self.lines = [line for pair in (lines if isinstance(lines[0], tuple) else (lines,)) for line in pair]
+        self.margin = margin
+        self._background = None
+        for line in self.lines:
+            line.set_animated(True)
+        self.canvas.mpl_connect('draw_event', self._on_draw)
+
+    def _on_draw(self, event):
+        self._background = self.canvas.copy_from_bbox(self.fig.bbox)
+        self._draw_lines()
+
+    def _draw_lines(self):
+        for line in self.lines:
+            self.fig.draw_artist(line)
+
+    def _rescale(self):
+        """Extends the limits of axes whose lines exceed them. Returns True if any changed."""
+        changed = False
+        for line in self.lines:
+            x, y = np.asarray(line.get_xdata()), np.asarray(line.get_ydata())
+            if len(x) == 0:
+                continue
+            for data, get_lim, set_lim in ((x, line.axes.get_xlim, line.axes.set_xlim),
+                                           (y, line.axes.get_ylim, line.axes.set_ylim)):
+                lo, hi = get_lim()
+                dmin, dmax = np.nanmin(data), np.nanmax(data)
+                if dmin < lo or dmax > hi:
+                    pad = (max(hi, dmax) - min(lo, dmin)) * (self.margin - 1)
+                    set_lim(lo if dmin >= lo else dmin - pad, hi if dmax <= hi else dmax + pad)
+                    changed = True
+        return changed
+
+    def update(self):
+        """Shows the current data of the live lines."""
+        if self._background is None or self._rescale():
+            self.canvas.draw()  # caches the new background and draws the lines via _on_draw
+        else:
+            self.canvas.restore_region(self._background)
+            self._draw_lines()
+        self.canvas.blit(self.fig.bbox)
+        self.canvas.flush_events()
+
+def update_plot(ax, lines, rx_values_copol, rx_values_crosspol, two_radar=False, rx_values2_copol=None, rx_values2_crosspol=None, renderer=None):
     """
     Updates the plot with new data for co-polarization and cross-polarization.
     If `two_radar` is True, it updates two subplots with two lines each.
@@ -93,8 +156,10 @@ def update_plot(ax, lines, rx_values_copol, rx_values_crosspol, two_radar=False,
         two_radar (bool): If True, updates the second radar plot as well.
         rx_values2_copol (list): Co-polarization data for radar 2 (optional, required if `two_radar` is True).
         rx_values2_crosspol (list): Cross-polarization data for radar 2 (optional, required if `two_radar` is True).
+        renderer (BlitRenderer): If given, only the lines are redrawn on the cached background
+                                 instead of redrawing the whole figure.
     """
-    
+
     if two_radar:
         # Update Radar 1 lines
         line1_crosspol, line1_copol = lines[0]
@@ -110,12 +175,7 @@ def update_plot(ax, lines, rx_values_copol, rx_values_crosspol, two_radar=False,
         line2_copol.set_ydata(rx_values2_copol)
         line2_crosspol.set_xdata(range(len(rx_values2_crosspol)))
         line2_crosspol.set_ydata(rx_values2_crosspol)
-        
-        # Rescale and refresh each subplot
-        for a in ax:
-            a.relim()
-            a.autoscale_view()
-        
+
     else:
         # Single radar case
         line_crosspol, line_copol = lines
@@ -124,11 +184,16 @@ def update_plot(ax, lines, rx_values_copol, rx_values_crosspol, two_radar=False,
         line_copol.set_ydata(rx_values_copol)
         line_crosspol.set_xdata(range(len(rx_values_crosspol)))
         line_crosspol.set_ydata(rx_values_crosspol)
-        
-        # Rescale and refresh the single plot
-        ax.relim()
-        ax.autoscale_view()
-    
+
+    if renderer is not None:
+        renderer.update()
+        return
+
+    # Rescale and refresh the subplot(s)
+    for a in (ax if two_radar else [ax]):
+        a.relim()
+        a.autoscale_view()
+
     plt.draw()
     plt.pause(0.01)
 
@@ -0,0 +1,70 @@
+import time
+
+
+class DisplayScheduler:
+    """
+    Paces the display loop at a target frame rate and counts the frames it does not show.
+
+    Acquisition runs at its own rate in the background; on every tick the display takes only the
+    newest frame of each source and the frames in between are dropped. Frames are identified by
+    increasing sequence numbers, e.g. those of a FrameRing, so the number of dropped frames is
+    the gap between the sequence numbers of consecutive shown frames.
+    """
+
+    def __init__(self, fps=20.0, idle=time.sleep, min_idle=0.001):
+        """
+        Parameters:
+            fps (float): Target display rate in frames per second.
+            idle (callable): Called with the seconds to wait until the next tick. Pass plt.pause
+                             to keep the GUI responsive while waiting.
+            min_idle (float): Shortest wait per tick, so GUI events are processed even when
+                              drawing takes longer than a frame period.
+        """
+        self.period = 1.0 / fps
+        self.idle = idle
+        self.min_idle = min_idle
+        self.shown = 0
+        self.skipped = 0
+        self._last_seqs = {}
+        self._next_tick = None
+        self._start = None
+
+    def wait(self):
+        """Waits until the next tick. Ticks missed because of slow drawing are not caught up."""
+        now = time.perf_counter()
+        if self._next_tick is None:
+            self._next_tick = self._start = now
+        self.idle(max(self._next_tick - now, self.min_idle))
+        self._next_tick = max(self._next_tick + self.period, time.perf_counter())
+
+    def take(self, source, seq):
+        """
+        Checks whether frame seq of source is newer than the last one taken from it.
+
+        Parameters:
+            source: Any hashable key for the frame source, e.g. the radar label.
+            seq (int): Sequence number of the newest available frame, None if there is none.
+
+        Returns:
+            bool: True if the frame is new. The frames since the last taken one count as skipped.
+        """
+        if seq is None:
+            return False
+        last = self._last_seqs.get(source)
+        if last is not None and seq <= last:
+            return False
+        if last is not None:
+            self.skipped += seq - last - 1
+        self._last_seqs[source] = seq
+        return True
+
+    def frame_drawn(self):
+        """Counts one drawn display frame."""
+        self.shown += 1
+
+    @property
+    def stats(self):
+        """Dictionary with drawn and skipped frames and the achieved display rate."""
+        elapsed = time.perf_counter() - self._start if self._start is not None else 0.0
+        return {"shown": self.shown, "skipped": self.skipped,
+                "fps": self.shown / elapsed if elapsed > 0 else 0.0}
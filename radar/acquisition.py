@@ -0,0 +1,195 @@
+import threading
+import time
+import numpy as np
+from Communication import Commands
+
+
+def fetch_range_frame(cmd):
+    """
+    Fetches range data of one chirp as a single NumPy frame.
+
+    Parameters:
+        cmd (Commands): An instance of the Commands class used to communicate with the radar.
+
+    Returns:
+        tuple: (time, frame) where time is the radar timestamp and frame is a complex64 array
+               of shape (channels, range bins), rows ordered by ascending channel number.
+    """
+    data = cmd.executeCmd(Commands.CMD_READ_RANGE_DATA, 0, asArray=True)
+    channels = data['data']
+    frame = np.stack([np.asarray(channels[c], dtype=np.complex64) for c in sorted(channels)])
+    return data['time'], frame
+
+
+class FrameRing:
+    """
+    Fixed-size ring of preallocated NumPy frames with a single writer and any number of readers.
+
+    The writer never waits for readers. Each slot carries the sequence number of the frame it
+    holds, set to -1 while the slot is being written. A reader copies a slot and checks the
+    sequence number before and after the copy, so a frame overwritten in the meantime is
+    detected and dropped instead of being returned torn.
+    """
+
+    def __init__(self, capacity=32):
+        self.capacity = capacity
+        self._frames = [None] * capacity
+        self._times = [0] * capacity
+        self._seqs = [-1] * capacity
+        self._written = 0  # number of published frames, the next sequence number
+
+    def push(self, radar_time, frame):
+        """
+        Copies frame into the next slot and publishes it. Slots are allocated on first use and
+        reallocated only if the frame shape or dtype changes.
+
+        Returns:
+            int: Sequence number of the published frame.
+        """
+        seq = self._written
+        idx = seq % self.capacity
+        slot = self._frames[idx]
+        self._seqs[idx] = -1
+        if slot is None or slot.shape != frame.shape or slot.dtype != frame.dtype:
+            slot = self._frames[idx] = np.empty_like(frame)
+        np.copyto(slot, frame)
+        self._times[idx] = radar_time
+        self._seqs[idx] = seq
+        self._written = seq + 1
+        return seq
+
+    @property
+    def last_seq(self):
+        """Sequence number of the newest frame, -1 if nothing was pushed yet."""
+        return self._written - 1
+
+    def read(self, seq):
+        """
+        Reads frame seq.
+
+        Returns:
+            tuple or None: (time, frame copy), or None if the frame was not written yet or was
+                           already overwritten by the writer.
+        """
+        if seq < 0 or seq >= self._written:
+            return None
+        idx = seq % self.capacity
+        if self._seqs[idx] != seq:
+            return None
+        frame = self._frames[idx].copy()
+        radar_time = self._times[idx]
+        if self._seqs[idx] != seq:
+            return None
+        return radar_time, frame
+
+    def latest(self):
+        """
+        Reads the newest complete frame.
+
+        Returns:
+            tuple or None: (seq, time, frame copy), or None if no frame is available.
+        """
+        seq = self.last_seq
+        while seq >= 0 and seq > self._written - self.capacity:
+            result = self.read(seq)
+            if result is not None:
+                return (seq,) + result
+            seq -= 1  # newest slot is just being written, fall back to the previous one
+        return None
+
+    def frames_since(self, seq):
+        """
+        Yields every available frame after sequence number seq, oldest first.
+
+        Frames the writer already overwrote are skipped; compare the yielded sequence numbers
+        to detect such gaps.
+
+        Yields:
+            tuple: (seq, time, frame copy)
+        """
+        seq = max(seq + 1, self._written - self.capacity)
+        while seq < self._written:
+            result = self.read(seq)
+            if result is not None:
+                yield (seq,) + result
+            seq += 1
+
+
+class AcquisitionWorker(threading.Thread):
+    """
+    Background thread that continuously fetches frames from one radar into a FrameRing.
+
+    Display and recorder read from the ring independently, so the acquisition rate does not
+    depend on how fast they consume frames. The worker starts paused; call resume() to begin
+    fetching.
+    """
+
+    def __init__(self, cmd, fetch=fetch_range_frame, capacity=32, name=None):
+        """
+        Parameters:
+            cmd (Commands): The Commands instance of the radar.
+            fetch (callable): Function fetch(cmd) returning (time, frame). Default is fetch_range_frame.
+            capacity (int): Number of frames kept in the ring.
+            name (str): Thread name, e.g. the radar label.
+        """
+        super().__init__(name=name, daemon=True)
+        self.cmd = cmd
+        self.fetch = fetch
+        self.ring = FrameRing(capacity)
+        self.num_frames = 0
+        self.num_errors = 0
+        self.last_error = None
+        self._resume_event = threading.Event()
+        self._stop_event = threading.Event()
+        self._fetch_lock = threading.Lock()  # held while a frame is fetched, see pause()
+
+    def run(self):
+        while not self._stop_event.is_set():
+            if not self._resume_event.wait(0.1):
+                continue
+            with self._fetch_lock:
+                if not self._resume_event.is_set():
+                    continue  # paused while waiting for the lock
+                try:
+                    radar_time, frame = self.fetch(self.cmd)
+                except Exception as e:
+                    self.num_errors += 1
+                    self.last_error = e
+                    time.sleep(0.01)
+                    continue
+                self.ring.push(radar_time, frame)
+                self.num_frames += 1
+
+    def resume(self):
+        """Starts or continues fetching frames."""
+        self._resume_event.set()
+
+    def pause(self, timeout=-1):
+        """
+        Stops fetching and waits until the frame in progress is done, so the radar is free
+        for other commands when it returns.
+
+        Parameters:
+            timeout (float): Seconds to wait for the current frame, -1 waits without limit.
+
+        Returns:
+            bool: False if the current frame did not finish within timeout.
+        """
+        self._resume_event.clear()
+        if threading.current_thread() is self:
+            return True
+        if not self._fetch_lock.acquire(timeout=timeout):
+            return False
+        self._fetch_lock.release()
+        return True
+
+    @property
+    def paused(self):
+        return not self._resume_event.is_set()
+
+    def stop(self, timeout=1.0):
+        """Ends the thread and waits for it up to timeout seconds."""
+        self._stop_event.set()
+        self._resume_event.set()
+        if self.is_alive():
+            self.join(timeout)
@@ -1,6 +1,10 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
 import Parameters as Pars
 from Communication import Commands, EthernetInterfaces
 
+_pair_executor = None  # Thread for the second radar of fetch_radar_pair, created on first use
+
 def init_radar(ip_address, udp_port=4120, host_port=4100):
     """
     Initializes the radar connection and configures radar parameters.
@@ -45,6 +49,9 @@ def init_radar(ip_address, udp_port=4120, host_port=4100):
         # Apply the modified radar parameters
         cmd.executeCmd(Commands.CMD_SET_RADAR_PARAMS_NO_EEP)
         print(f'Radar parameters set for {ip_address}.')
+        
+        # Fill the configuration cache, so measurements can start without these round-trips
+        fetch_radar_info(cmd)
     except Exception as e:
         # Handle any errors in parameter retrieval or configuration
         print(f"Error setting radar parameters for {ip_address}: {e}")
@@ -58,6 +65,9 @@ def fetch_radar_info(cmd):
     """
     Fetches radar information parameters, frontend parameters, and radar parameters.
     
+    Values come from the configuration cache of cmd (see Commands.executeCached) and are only
+    read from the radar if not cached yet or after a command changed the configuration.
+    
     Parameters:
         cmd (Commands): An instance of the Commands class used to communicate with the radar.
     
@@ -65,29 +75,30 @@ def fetch_radar_info(cmd):
         tuple: A tuple containing (infoParams, frontendParams, radarParams), or (None, None, None) if an error occurs.
     """
     try:
-        infoParams = cmd.executeCmd(Commands.CMD_INFO)
-        frontendParams = cmd.executeCmd(Commands.CMD_GET_FRONTEND_PARAMS)
-        radarParams = cmd.executeCmd(Commands.CMD_GET_RADAR_PARAMS)
+        infoParams = cmd.executeCached(Commands.CMD_INFO)
+        frontendParams = cmd.executeCached(Commands.CMD_GET_FRONTEND_PARAMS)
+        radarParams = cmd.executeCached(Commands.CMD_GET_RADAR_PARAMS)
         return infoParams, frontendParams, radarParams
     except Exception as e:
         print(f"Error getting radar parameters with error: {e}")
         return None, None, None  # Fallback return in case of error
     
     
-def fetch_radar_data(cmd):
+def fetch_radar_data(cmd, as_array=False):
     """
     Fetches radar range data for a specific chirp (radar pulse).
     
     Parameters:
         cmd (Commands): An instance of the Commands class used to communicate with the radar.
-        chirpNo (int): The chirp number for which to fetch the radar data.
+        as_array (bool): If True, each channel is returned as a NumPy array (complex64 for
+                         channels 0/1, uint16 for the magnitude channels 2/3) instead of a list.
     
     Returns:
         dict or None: The radar data for the specified chirp if successful, or None if an error occurs.
     """
     try:
         # Execute the radar command to read range data for the given chirp number
-        data = cmd.executeCmd(Commands.CMD_READ_RANGE_DATA, 0)
+        data = cmd.executeCmd(Commands.CMD_READ_RANGE_DATA, 0, asArray=as_array)
         # Return the retrieved radar data
         return data
     
@@ -98,6 +109,54 @@ def fetch_radar_data(cmd):
         return None
 
 
+def _timed_fetch(cmd, as_array):
+    """Fetches radar data and returns it with the host time (s) in the middle of the request."""
+    t_start = time.time()
+    data = fetch_radar_data(cmd, as_array=as_array)
+    return data, (t_start + time.time()) / 2
+
+
+def fetch_radar_pair(cmd1, cmd2, as_array=False):
+    """
+    Fetches radar range data of two radars (e.g. 13GHz and 17GHz) concurrently.
+    
+    The request to the second radar runs on a helper thread while the first one runs on the
+    calling thread, so a pair takes about as long as the slower radar instead of both in turn.
+    
+    Parameters:
+        cmd1 (Commands): Commands instance of the first radar.
+        cmd2 (Commands): Commands instance of the second radar.
+        as_array (bool): Passed to fetch_radar_data for both radars.
+    
+    Returns:
+        dict or None: If both radars deliver data, a dictionary with:
+            - data1, data2: The radar data as returned by fetch_radar_data.
+            - time1, time2: The radar timestamps of the data.
+            - host_time1, host_time2: Host time (s since epoch) in the middle of each request.
+            - skew: host_time2 - host_time1 in seconds.
+        None if fetching fails for either radar.
+    """
+    global _pair_executor
+    if _pair_executor is None:
+        _pair_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="radar_pair")
+    
+    future2 = _pair_executor.submit(_timed_fetch, cmd2, as_array)
+    data1, host_time1 = _timed_fetch(cmd1, as_array)
+    data2, host_time2 = future2.result()
+    
+    if data1 is None or data2 is None:
+        return None
+    return {
+        "data1": data1,
+        "data2": data2,
+        "time1": data1['time'],
+        "time2": data2['time'],
+        "host_time1": host_time1,
+        "host_time2": host_time2,
+        "skew": host_time2 - host_time1,
+    }
+
+
 def close_radar(com):
     com.Close()
     print("Radar interface closed.")
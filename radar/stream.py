@@ -0,0 +1,297 @@
+import socket
+import struct
+import threading
+import numpy as np
+import Parameters as Pars
+from Communication import Commands
+from Communication.CRC import CRC16
+from Communication.EthernetInterfaces import EnetStreamConfig
+from radar.acquisition import FrameRing
+
+# Stream_Mask bits (radar manual, Table 53)
+MASK_SYNC = 0x0001          # every data set starts with SYNC_WORD
+MASK_COUNTER = 0x0002       # measurement counter is sent after the sync word
+MASK_CRC = 0x0004           # CRC16 over the data set is appended
+MASK_BIN_INTERVAL = 0x0100  # range FFT, one chirp: only bins around the found target are sent
+MASK_FIXED_BINS = 0x0200    # with MASK_BIN_INTERVAL: always 2 * Stream_Variable + 1 bins
+
+SYNC_WORD = b"\xAA\x55\xCC\x33"
+ALL_CHIRPS = 0xFFFF
+_PEAK_INFO = struct.Struct(">HHH")  # channel, range bin and magnitude of the found target
+
+
+class StreamFormat:
+    """
+    Layout of the data sets of a single data stream (radar manual, section 5.5).
+
+    Supported are raw data (Processing = 0) and range FFT data (Processing = 1). Data sets
+    are parsed into NumPy arrays in the same layout as the polling commands return them:
+    int16 (channels, samples) for raw data, complex64 (channels, bins) for range data, with
+    a leading chirp axis if all chirps are streamed.
+    """
+
+    def __init__(self, radarParams, mask, variable=0):
+        """
+        Parameters:
+            radarParams (RadarParameters): Current radar parameters of the streaming radar.
+            mask (int): Stream_Mask of the stream, see the MASK_* bits.
+            variable (int): Stream_Variable, the chirp number (ALL_CHIRPS for all chirps) or
+                            the bin interval for range data of one chirp radar cubes.
+        """
+        rp = radarParams
+        self.mask = mask
+        self.header = struct.Struct(">" + ("4s" if mask & MASK_SYNC else "") +
+                                    ("I" if mask & MASK_COUNTER else "") + "QH")
+        self.crc_size = 2 if mask & MASK_CRC else 0
+        self.peak_info = False
+        self.flip_iq = False
+        one_chirp_cube = rp.RadarCube <= Pars.RCUBE_smpl2048_crp1_4rx
+        chirps = rp._NumDopplerBins if variable == ALL_CHIRPS and not one_chirp_cube else 1
+
+        if rp.Processing == Pars.PROC_NoProcessing:
+            self.channels = [c for c in range(rp.getMaxNumRxChan()) if (1 << c) & rp.RxChannels]
+            self.shape = (chirps, len(self.channels), rp._NumSamples)
+            self.complex = False
+        elif rp.Processing == Pars.PROC_RangeFFT and one_chirp_cube:
+            # Only the complex channels are sent, imaginary part first (manual, Table 60)
+            self.channels = [c for c in range(2) if (1 << c) & rp.RxChannels]
+            if mask & MASK_BIN_INTERVAL and not mask & MASK_FIXED_BINS:
+                raise ValueError("Bin interval streams need MASK_FIXED_BINS, the number of bins must be fixed")
+            bins = 2 * variable + 1 if mask & MASK_BIN_INTERVAL else rp._ActiveRangeBins
+            self.shape = (1, len(self.channels), bins)
+            self.complex = True
+            self.flip_iq = True
+            self.peak_info = None   # appended peak info is detected from the first data sets
+        elif rp.Processing == Pars.PROC_RangeFFT:
+            self.channels = [c for c in range(rp.getMaxNumRxChan()) if (1 << c) & rp.RxChannels]
+            self.shape = (chirps, len(self.channels), rp._ActiveRangeBins)
+            self.complex = True
+        else:
+            raise ValueError("Streaming is only supported for raw data and range FFT data")
+
+        self.data_size = 2 * int(np.prod(self.shape)) * (2 if self.complex else 1)
+
+    def sizes(self):
+        """Possible sizes of one data set in bytes, several while the peak info is not known."""
+        size = self.header.size + self.data_size + self.crc_size
+        if self.peak_info is None:
+            return [size, size + _PEAK_INFO.size]
+        return [size + _PEAK_INFO.size if self.peak_info else size]
+
+    def parse(self, buf):
+        """
+        Parses one data set.
+
+        Returns:
+            dict: "count" (measurement counter or None), "time" (radar time in ms), "status",
+                  "channels" and "data"; for range data of one chirp cubes also "channel",
+                  "rangeBin" and "mag" of the found target.
+        """
+        fields = self.header.unpack_from(buf)
+        frame = {"count": fields[-3] if self.mask & MASK_COUNTER else None,
+                 "time": fields[-2], "status": fields[-1], "channels": self.channels}
+        values = np.frombuffer(buf, dtype=">i2", count=self.data_size // 2, offset=self.header.size)
+        if self.complex:
+            values = values.astype(np.float32).reshape(self.shape + (2,))
+            if self.flip_iq:
+                values = values[..., ::-1]
+            data = np.ascontiguousarray(values).view(np.complex64)[..., 0]
+        else:
+            data = values.astype(np.int16).reshape(self.shape)
+        frame["data"] = data[0] if self.shape[0] == 1 else data
+        if self.peak_info:
+            frame["channel"], frame["rangeBin"], frame["mag"] = _PEAK_INFO.unpack_from(buf, self.header.size + self.data_size)
+        return frame
+
+
+class StreamReceiver(threading.Thread):
+    """
+    Receives a data stream pushed by the radar over UDP or TCP.
+
+    The radar measures and sends at its own MeasInterval, so no command round trip is needed
+    per frame. Data sets are framed by the sync word, checked and parsed into NumPy arrays on
+    this thread. Each frame is pushed into a FrameRing (like AcquisitionWorker, so the display
+    can read it the same way), passed to the optional callback and can be iterated over.
+
+    Usage:
+        receiver = StreamReceiver(cmd, host_port=4200)
+        receiver.start()
+        for seq, radar_time, data in receiver:
+            ...
+        receiver.stop()
+    """
+
+    def __init__(self, cmd, host_port=4200, radar_port=None, tcp=False, mask=MASK_COUNTER,
+                 variable=0, callback=None, capacity=32, host_ip=None):
+        """
+        Parameters:
+            cmd (Commands): Commands instance of the radar, connected over Ethernet.
+            host_port (int): UDP port of this host the stream is sent to.
+            radar_port (int): UDP or TCP port of the radar which sends the stream. Default is
+                              the port of the command interface for UDP, 4120 for TCP.
+            tcp (bool): If True, the stream is received over a TCP connection to radar_port.
+            mask (int): Stream_Mask bits. MASK_SYNC is always added for framing.
+            variable (int): Stream_Variable, see StreamFormat.
+            callback (callable): Called with each parsed frame dict on the receiver thread.
+            capacity (int): Number of frames kept in the ring.
+            host_ip (str): IP address of this host as seen by the radar, found automatically if None.
+        """
+        super().__init__(name="StreamReceiver", daemon=True)
+        self.cmd = cmd
+        config = cmd.getInterface().config
+        self.radar_ip = config.IP
+        self.radar_port = radar_port if radar_port is not None else (4120 if tcp else config.Port)
+        self.host_port = host_port
+        self.host_ip = host_ip
+        self.tcp = tcp
+        self.mask = mask | MASK_SYNC
+        self.variable = variable
+        self.callback = callback
+        self.ring = FrameRing(capacity)
+        self.format = None
+        self.num_frames = 0
+        self.lost_frames = 0    # measurements missing in the counter sequence
+        self.crc_errors = 0
+        self.sync_errors = 0    # times bytes had to be skipped to find the next sync word
+        self.last_error = None
+        self._last_count = None
+        self._socket = None
+        self._new_frame = threading.Condition()
+        self._stop_event = threading.Event()
+        self._restore_continuous = False
+
+    def start(self):
+        """Opens the socket, starts the stream on the radar and then the receiver thread."""
+        cmd = self.cmd
+        rp = cmd.executeCached(Commands.CMD_GET_RADAR_PARAMS)
+        if not rp.ContinuousMeas:
+            # The radar only sends on its own while measuring continuously
+            rp.ContinuousMeas = 1
+            cmd.executeCmd(Commands.CMD_SET_RADAR_PARAMS_NO_EEP)
+            self._restore_continuous = True
+        self.format = StreamFormat(rp, self.mask, self.variable)
+
+        if self.tcp:
+            self._socket = socket.create_connection((self.radar_ip, self.radar_port), timeout=1.0)
+        else:
+            self._socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            self._socket.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 1 << 22)
+            self._socket.bind(('', self.host_port))
+            self._socket.settimeout(0.2)
+        if self.host_ip is None:
+            self.host_ip = local_ip_for(self.radar_ip)
+
+        streamCfg = EnetStreamConfig(IP_str=self.host_ip, Port=self.radar_port, OwnPort=self.host_port,
+                                     EnetType=EnetStreamConfig.TYPE_TCP if self.tcp else EnetStreamConfig.TYPE_UDP,
+                                     Mask=self.mask)
+        streamCfg.ChirpRaw = streamCfg.ChirpRange = self.variable
+        cmd.executeCmd(Commands.CMD_START_ETHERNET_STREAM, streamCfg)
+        super().start()
+
+    def stop(self, timeout=1.0):
+        """Stops the stream on the radar, ends the thread and closes the socket."""
+        self._stop_event.set()
+        try:
+            self.cmd.executeCmd(Commands.CMD_STOP_ETHERNET_STREAM,
+                                EnetStreamConfig.TYPE_TCP if self.tcp else EnetStreamConfig.TYPE_UDP, self.radar_port)
+            if self._restore_continuous:
+                self.cmd.radarParams.ContinuousMeas = 0
+                self.cmd.executeCmd(Commands.CMD_SET_RADAR_PARAMS_NO_EEP)
+                self._restore_continuous = False
+        finally:
+            if self.is_alive():
+                self.join(timeout)
+            if self._socket is not None:
+                self._socket.close()
+                self._socket = None
+            with self._new_frame:
+                self._new_frame.notify_all()
+
+    def run(self):
+        buf = bytearray()
+        chunk = bytearray(1 << 16)
+        view = memoryview(chunk)
+        while not self._stop_event.is_set():
+            try:
+                n = self._socket.recv_into(view)
+            except socket.timeout:
+                continue
+            except OSError as e:
+                if not self._stop_event.is_set():
+                    self.last_error = e
+                break
+            if n == 0:
+                break   # TCP connection closed by the radar
+            buf += view[:n]
+            self._parse(buf)
+
+    def _parse(self, buf):
+        """Parses all complete data sets in buf and removes them from it."""
+        fmt = self.format
+        crc = CRC16()
+        while True:
+            start = buf.find(SYNC_WORD)
+            if start < 0:
+                del buf[:max(len(buf) - len(SYNC_WORD) + 1, 0)]
+                return
+            if start > 0:
+                self.sync_errors += 1
+                del buf[:start]
+            sizes = fmt.sizes()
+            if len(sizes) > 1:
+                # Peak info not known yet: the right size is followed by the next sync word
+                size = next((s for s in sizes if buf[s:s + len(SYNC_WORD)] == SYNC_WORD), None)
+                if size is None:
+                    if len(buf) < sizes[-1] + len(SYNC_WORD):
+                        return
+                    del buf[:1]
+                    continue
+                fmt.peak_info = size != sizes[0]
+            else:
+                size = sizes[0]
+                if len(buf) < size:
+                    return
+            if fmt.crc_size:
+                crc.reset()
+                crc.process_buf(buf, size - 2)
+                if crc.get_crc_value() != struct.unpack_from(">H", buf, size - 2)[0]:
+                    self.crc_errors += 1
+                    del buf[:1]     # search the next sync word
+                    continue
+            frame = fmt.parse(bytes(buf[:size]))
+            del buf[:size]
+            self._publish(frame)
+
+    def _publish(self, frame):
+        if frame["count"] is not None and self._last_count is not None:
+            self.lost_frames += max(frame["count"] - self._last_count - 1, 0)
+        self._last_count = frame["count"]
+        self.ring.push(frame["time"], frame["data"])
+        self.num_frames += 1
+        with self._new_frame:
+            self._new_frame.notify_all()
+        if self.callback is not None:
+            self.callback(frame)
+
+    def __iter__(self):
+        """
+        Yields (seq, time, data) of every frame received from now on until the receiver is
+        stopped. Frames overwritten in the ring before they were read are skipped.
+        """
+        seq = self.ring.last_seq
+        while True:
+            with self._new_frame:
+                self._new_frame.wait_for(lambda: self.ring.last_seq > seq or self._stop_event.is_set()
+                                         or not self.is_alive(), timeout=1.0)
+            for item in self.ring.frames_since(seq):
+                seq = item[0]
+                yield item
+            if (self._stop_event.is_set() or not self.is_alive()) and self.ring.last_seq <= seq:
+                return
+
+
+def local_ip_for(remote_ip):
+    """Returns the IP address of the local interface used to reach remote_ip."""
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as s:
+        s.connect((remote_ip, 9))   # no packet is sent, only the route is looked up
+        return s.getsockname()[0]
@@ -0,0 +1,103 @@
+"""
+Tests of Communication.AsyncEthernet against fake radars on localhost.
+
+Run with:
+    python -m unittest discover tests
+"""
+import asyncio
+import struct
+import time
+import unittest
+from Communication import Commands
+from Communication.AsyncEthernet import openRadar, executeAll
+from Communication.CRC import CRC16
+
+READ_DATA = 0x0030
+
+
+class FakeRadar(asyncio.DatagramProtocol):
+    """
+    Answers READ_DATA requests with raw data, sent as several datagrams of at most chunk bytes.
+
+    The datagrams whose indices are in drop are not sent, as if lost on the network.
+    """
+
+    def __init__(self, payload, chunk=1500, drop=()):
+        self.payload = payload
+        self.chunk = chunk
+        self.drop = set(drop)
+        self.requests = 0
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def datagram_received(self, data, addr):
+        self.requests += 1
+        code = struct.unpack(">H", data[:2])[0]
+        response = struct.pack(">HHQI", code, 0, 1234, len(self.payload)) + self.payload
+        crc = CRC16()
+        crc.process_buf(response, len(response))
+        response += crc.get_crc_value_as_bytes()
+        asyncio.ensure_future(self._send(response, addr))
+
+    async def _send(self, response, addr):
+        for n, start in enumerate(range(0, len(response), self.chunk)):
+            await asyncio.sleep(0.01)
+            if n not in self.drop:
+                self.transport.sendto(response[start:start + self.chunk], addr)
+
+
+async def start_radar(radar):
+    """Starts radar on a free localhost port and returns AsyncCommands connected to it."""
+    loop = asyncio.get_running_loop()
+    transport, _ = await loop.create_datagram_endpoint(lambda: radar, local_addr=("127.0.0.1", 0))
+    cmd = await openRadar("127.0.0.1", Port=transport.get_extra_info("sockname")[1], OwnPort=0)
+    return cmd, transport
+
+
+def raw_payload(cmd):
+    """Raw data of one chirp of all active channels in the format of cmd.radarParams."""
+    rp = cmd.radarParams
+    samples = rp.getNumActiveRxChan() * rp._NumSamples
+    return struct.pack(">%dh" % samples, *(n % 2000 - 1000 for n in range(samples)))
+
+
+class AsyncEthernetTest(unittest.TestCase):
+
+    def run_radars(self, radars, timeout=0.5):
+        """Reads data from all radars at once. Returns the results and the elapsed seconds."""
+        async def run():
+            started = [await start_radar(radar) for radar in radars]
+            cmds = [cmd for cmd, _ in started]
+            for radar, cmd in zip(radars, cmds):
+                radar.payload = raw_payload(cmd)
+            t_start = time.perf_counter()
+            try:
+                results = await executeAll(cmds, Commands.CMD_READ_DATA, 0, timeout=timeout)
+            finally:
+                for cmd, transport in started:
+                    cmd.getInterface().Close()
+                    transport.close()
+            return results, time.perf_counter() - t_start
+        return asyncio.run(asyncio.wait_for(run(), 10))
+
+    def test_response_split_across_datagrams(self):
+        radar = FakeRadar(b"", chunk=1500)
+        (result,), _ = self.run_radars([radar])
+        self.assertEqual(result["Time"], 1234)
+        raw = result["Raw"][0]
+        self.assertEqual(len(raw), 4)
+        self.assertEqual(list(raw[0][:3]), [-1000, -999, -998])
+        self.assertEqual(radar.requests, 1)   # the request is not sent again for the other datagrams
+
+    def test_lost_datagram_times_out_without_blocking_other_radars(self):
+        radars = [FakeRadar(b"", chunk=1500, drop=(1,)), FakeRadar(b"", chunk=1500)]
+        (lost, ok), elapsed = self.run_radars(radars, timeout=0.5)
+        self.assertIsInstance(lost, Commands.CommandError)
+        self.assertIn("Timeout", str(lost))
+        self.assertEqual(ok["Time"], 1234)
+        self.assertLess(elapsed, 2.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
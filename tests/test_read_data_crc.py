@@ -0,0 +1,82 @@
+"""
+Tests of the running CRC check of CMD_READ_DATA responses received in several packets.
+
+Run with:
+    python -m unittest discover tests
+"""
+import struct
+import unittest
+from Communication import Commands
+from Communication.CRC import CRC16
+from Communication.Interface import Interface
+
+
+class FakeEthernet(Interface):
+    """Answers every command with response, returned in packets of at most chunk bytes like UDP datagrams."""
+
+    def __init__(self, response, chunk=1500):
+        Interface.__init__(self, name="FakeEthernet", interfaceType="Ethernet")
+        self.packets = [response[start:start + chunk] for start in range(0, len(response), chunk)]
+        self.sent = []
+
+    def Open(self):
+        return True
+
+    def IsOpen(self):
+        return True
+
+    def Write(self, data):
+        self.sent.append(bytes(data))
+        return len(data)
+
+    def Read(self, n):
+        return self.packets.pop(0)[:n] if self.packets else b""
+
+    def ReadInto(self, buf):
+        packet = self.Read(len(buf))
+        buf[:len(packet)] = packet
+        return len(packet)
+
+
+def read_data_response(cmd):
+    """CMD_READ_DATA response with one chirp of raw data for the radar parameters of cmd."""
+    rp = cmd.radarParams
+    samples = rp.getNumActiveRxChan() * rp._NumSamples
+    payload = struct.pack(">%dh" % samples, *(n % 2000 - 1000 for n in range(samples)))
+    response = struct.pack(">HHQI", 0x0030, 0, 1234, len(payload)) + payload
+    crc = CRC16()
+    crc.process_buf(response, len(response))
+    return response + crc.get_crc_value_as_bytes()
+
+
+class ReadDataCrcTest(unittest.TestCase):
+
+    def read(self, corrupt=None):
+        cmd = Commands.Commands()
+        response = bytearray(read_data_response(cmd))
+        if corrupt is not None:
+            response[corrupt] ^= 0x01
+        interface = FakeEthernet(bytes(response))
+        cmd.setInterface(interface)
+        self.assertGreater(len(interface.packets), 2)
+        return cmd.executeCmd(Commands.CMD_READ_DATA, 0)
+
+    def test_correct_crc_over_several_packets(self):
+        result = self.read()
+        self.assertEqual(result["Time"], 1234)
+        self.assertEqual(list(result["Raw"][0][0][:3]), [-1000, -999, -998])
+
+    def test_corrupted_packet_rejected(self):
+        for position in (100, 2000, -3):   # first, a middle and the last packet
+            with self.subTest(position=position):
+                with self.assertRaises(Commands.CommandError) as error:
+                    self.read(corrupt=position)
+                self.assertIn("CRC", str(error.exception))
+
+    def test_corrupted_crc_rejected(self):
+        with self.assertRaises(Commands.CommandError):
+            self.read(corrupt=-1)
+
+
+if __name__ == "__main__":
+    unittest.main()
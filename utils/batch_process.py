@@ -0,0 +1,147 @@
+"""
+Batch reprocessing of recordings.
+
+Computes the range spectra of every recording in a directory on a pool of processes and
+writes one compressed .npz result per recording (a.bin -> a.bin.npz) plus an index.jsonl manifest. With --resume,
+recordings already listed as done in the manifest are skipped, so an interrupted run continues
+where it stopped.
+
+Usage:
+    python -m utils.batch_process ./data/ --output ./results/ --workers 4 --resume
+"""
+import argparse
+import glob
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
+from utils.signal_processing2 import process_recording
+
+MANIFEST = "index.jsonl"
+
+
+def process_file(filename, output_dir, window="hft95", per_chirp=False):
+    """
+    Computes the range spectra of one recording and stores them in output_dir.
+
+    Parameters:
+        filename (str): Path of the recording (.txt or .bin).
+        output_dir (str): Directory for the result file.
+        window (str): Window kind for signal_processing2.get_window.
+        per_chirp (bool): If True, the spectra of every chirp are stored too, else only the means.
+
+    Returns:
+        dict: Manifest entry with file, output, status ("ok" or "error"), chirps, seconds and
+              error message if processing failed.
+    """
+    entry = {"file": filename}
+    t_start = time.perf_counter()
+    try:
+        result = process_recording(filename, window=window)
+        # The source extension stays in the name, so a.txt and a.bin don't share a result file
+        output = os.path.join(output_dir, os.path.basename(filename) + ".npz")
+        arrays = {
+            "dist": result["dist"],
+            "copol_mean": result["copol_mean"],
+            "crosspol_mean": result["crosspol_mean"],
+            "timestamps": result["timestamps"],
+            "header": json.dumps(result["header"], default=str),
+        }
+        if per_chirp:
+            arrays["copol"] = result["copol"].astype(np.float32)
+            arrays["crosspol"] = result["crosspol"].astype(np.float32)
+        np.savez_compressed(output, **arrays)
+        entry.update(output=output, status="ok", chirps=len(result["copol"]))
+    except Exception as e:
+        entry.update(status="error", error=str(e))
+    entry["seconds"] = round(time.perf_counter() - t_start, 3)
+    return entry
+
+
+def normalize_path(path):
+    """Returns the absolute, normalized form of path, so relative and absolute paths compare equal."""
+    return os.path.normcase(os.path.abspath(path))
+
+
+def read_manifest(output_dir):
+    """Returns the normalized paths of the recordings listed as successfully processed in the manifest."""
+    done = set()
+    path = os.path.join(output_dir, MANIFEST)
+    if os.path.exists(path):
+        with open(path) as file:
+            for line in file:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue  # line cut off by an interrupted run
+                if entry.get("status") == "ok" and os.path.exists(entry.get("output", "")):
+                    done.add(normalize_path(entry["file"]))
+    return done
+
+
+def find_recordings(directory, patterns=("*.bin", "*.txt")):
+    """Returns the sorted paths of all recordings in directory."""
+    files = set()
+    for pattern in patterns:
+        files.update(glob.glob(os.path.join(directory, pattern)))
+    return sorted(files)
+
+
+def run_batch(directory, output_dir, workers=None, window="hft95", per_chirp=False, resume=False):
+    """
+    Processes all recordings of directory on a process pool.
+
+    Parameters:
+        directory (str): Directory with the recordings.
+        output_dir (str): Directory for results and manifest, created if missing.
+        workers (int): Number of worker processes, None for the number of CPUs.
+        window (str): Window kind for the range FFT.
+        per_chirp (bool): Also store the spectra of every chirp.
+        resume (bool): Skip recordings already processed according to the manifest.
+
+    Returns:
+        list: Manifest entries of the recordings processed in this run.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    files = find_recordings(directory)
+    if resume:
+        done = read_manifest(output_dir)
+        skipped = len(files)
+        files = [f for f in files if normalize_path(f) not in done]
+        print(f"Resuming: {skipped - len(files)} recordings already processed")
+
+    entries = []
+    t_start = time.perf_counter()
+    with open(os.path.join(output_dir, MANIFEST), 'a') as manifest, \
+         ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(process_file, f, output_dir, window, per_chirp) for f in files]
+        for n, future in enumerate(as_completed(futures), 1):
+            entry = future.result()
+            # One line per finished file, flushed right away, so it serves as checkpoint
+            manifest.write(json.dumps(entry) + "\n")
+            manifest.flush()
+            entries.append(entry)
+            status = entry["status"] if entry["status"] != "error" else "error: " + entry["error"]
+            print(f"[{n}/{len(files)}] {entry['file']}: {status} ({entry['seconds']:.2f} s)")
+
+    failed = sum(entry["status"] != "ok" for entry in entries)
+    print(f"Processed {len(entries)} recordings in {time.perf_counter() - t_start:.1f} s, {failed} failed")
+    return entries
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compute range spectra of all recordings in a directory.")
+    parser.add_argument("directory", nargs="?", default="./data/", help="directory with .txt/.bin recordings")
+    parser.add_argument("--output", default="./results/", help="directory for results and manifest")
+    parser.add_argument("--workers", type=int, default=None, help="number of worker processes (default: CPUs)")
+    parser.add_argument("--window", default="hft95", help="window function, e.g. hft95, hamming, blackman")
+    parser.add_argument("--per-chirp", action="store_true", help="also store the spectra of every chirp")
+    parser.add_argument("--resume", action="store_true", help="skip recordings already in the manifest")
+    args = parser.parse_args()
+    run_batch(args.directory, args.output, workers=args.workers, window=args.window,
+              per_chirp=args.per_chirp, resume=args.resume)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,7 @@
-import pandas as pd
 import numpy as np
-from scipy.fft import fft, fftfreq
+from functools import lru_cache
+import Parameters as Pars
+from data_io.file_reader import load_recording
 
 scaling_factor_adc = (3.3+3.3)/(2**12)
 frequence_echantillonage = 10e6          
@@ -14,47 +15,141 @@ def freq_to_dist(xf):
     dist = xf*c*ramptime/(2*B)
     return(dist)
 
-def hft95 (N):
-    window = np.zeros((N))
-    for j in range(N):
-        z = 2*np.pi*j/N
-        window[j] = 1 - 1.9383379*np.cos(z) + 1.3045202*np.cos(2*z) - 0.4028270*np.cos(3*z) + 0.0350665*np.cos(4*z)
+# Cosine-sum windows w[j] = a0 - a1*cos(z) + a2*cos(2z) - a3*cos(3z) + ...
+# kind: (coefficients a0, a1, ..., symmetric). Periodic windows use z = 2*pi*j/N,
+# symmetric ones z = 2*pi*j/(N-1) like np.hamming.
+WINDOWS = {
+    "rect": ((1.0,), True),
+    "hft95": ((1.0, 1.9383379, 1.3045202, 0.4028270, 0.0350665), False),
+    "hamming": ((0.54, 0.46), True),
+    "hann": ((0.5, 0.5), True),
+    "blackman": ((0.42, 0.5, 0.08), True),
+    "nuttall": ((0.3635819, 0.4891775, 0.1365995, 0.0106411), True),
+}
+
+# Window functions selectable in the radar (RadarParameters.RangeWinFunc/DopplerWinFunc)
+FFTWIN_KINDS = {
+    Pars.FFTWIN_NoWin: "rect",
+    Pars.FFTWIN_Blackman: "blackman",
+    Pars.FFTWIN_Hamming: "hamming",
+    Pars.FFTWIN_Hann: "hann",
+    Pars.FFTWIN_Nuttal: "nuttall",
+}
+
+
+def get_window(kind, N):
+    """
+    Returns a window and its normalization sums, computed once per (kind, N) and cached.
+    
+    Parameters:
+        kind (str or int): One of the names in WINDOWS, or a radar FFTWIN_* value.
+        N (int): Window length.
+    
+    Returns:
+        tuple: (window, S1, S2, NENBW, ENBW) with
+            - window: Read-only float64 array of length N, shared between callers.
+            - S1, S2: Sum of the window and of its squares.
+            - NENBW: Normalized equivalent noise bandwidth in bins.
+            - ENBW: Effective noise bandwidth in Hz at the ADC sampling rate.
+    """
+    kind = FFTWIN_KINDS.get(kind, kind)
+    if kind not in WINDOWS:
+        raise ValueError(f"Unknown window: {kind}")
+    return _window(kind, int(N))
+
+
+@lru_cache(maxsize=64)
+def _window(kind, N):
+    coefficients, symmetric = WINDOWS[kind]
+    if N <= 1:
+        window = np.ones(N)                                 #like np.hamming(1) etc.
+    else:
+        z = 2*np.pi*np.arange(N) / ((N - 1) if symmetric else N)
+        window = np.zeros(N)
+        for k, a in enumerate(coefficients):
+            window += (-1)**k * a * np.cos(k*z)
+    window.flags.writeable = False
     
     S1 = np.sum(window)
     S2 = np.sum(window*window)
-    nenbw = N*S2/(S1**2)                                    #normalized equivalent noise bandwidth  
-    enbw = frequence_echantillonage*S2/(S1**2)              #effective noise bandwidth
+    if S1 == 0:                                             #empty window
+        nenbw = enbw = np.nan
+    else:
+        nenbw = N*S2/(S1**2)                                #normalized equivalent noise bandwidth  
+        enbw = frequence_echantillonage*S2/(S1**2)          #effective noise bandwidth
+    return(window,S1,S2,nenbw,enbw)
+
+def hft95 (N):
+    window,S1,S2,_,_ = get_window("hft95", N)
     return(window,S1,S2)
 
 def ham (N):
-    window = np.hamming(N)
-    
-    S1 = np.sum(window)
-    S2 = np.sum(window*window)
-    nenbw = N*S2/(S1**2)                                    #normalized equivalent noise bandwidth  
-    enbw = frequence_echantillonage*S2/(S1**2)              #effective noise bandwidth
+    window,S1,S2,_,_ = get_window("hamming", N)
     return(window,S1,S2)
 
-
-
-df = pd.read_csv(dat,skiprows=62,index_col=0)
-
-e_copol = df[0] + 1j*df[1]
-e_crosspol = df[2] + 1j*df[3]
-N = len(e_copol)
-window,s1,s2 = hft95(N)
-xf = fftfreq(N, T)
-dist = freq_to_dist(xf[0:N//2])
-
-
-e_copol_f = fft(np.array((e_copol-e_copol.mean())*window))
-e_crosspol_f = fft(np.array((e_crosspol-e_crosspol.mean())*window))
-
-
-ps_rms_cp = (2*np.abs(e_copol_f[0:N//2])**2)/(s1**2)
-usefull_cp = ps_rms_cp*scaling_factor_adc
-
-ps_rms_cr = (2*np.abs(e_crosspol_f[0:N//2])**2)/(s1_h**2)
-usefull_cr = ps_rms_cr*scaling_factor_adc
-
-
+def range_spectra(chirps, window="hft95", workers=None):
+    """
+    Computes range power spectra of all chirps of a recording in one vectorized call.
+    
+    Channels 0/1 are combined to the complex co-polar signal (I + jQ) and channels 2/3 to
+    the cross-polar one. Per chirp the mean is removed, the window applied and the FFT taken
+    over the samples; the first N/2 bins are scaled to a power spectrum.
+    
+    Parameters:
+        chirps (numpy.ndarray): Raw samples of shape (chirps, 4, samples), e.g. from
+                                data_io.file_reader.load_recording.
+        window (str or int): Window kind for get_window. Default is "hft95".
+        workers (int): Number of threads used by scipy.fft, None for a single thread
+                       or -1 for all CPUs.
+    
+    Returns:
+        dict: Dictionary with:
+            - dist: Distance of each range bin in m, shape (N/2,).
+            - copol, crosspol: Power spectra of each chirp, shape (chirps, N/2).
+            - copol_mean, crosspol_mean: Spectra averaged over all chirps, shape (N/2,).
+    """
+    from scipy.fft import fft, fftfreq  # imported here so that loading this module stays fast
+    chirps = np.asarray(chirps, dtype=np.float64)
+    N = chirps.shape[-1]
+    e = chirps[:, 0::2] + 1j*chirps[:, 1::2]        # (chirps, [copol, crosspol], samples)
+    window,s1,_,_,_ = get_window(window, N)
+    
+    e_f = fft((e - e.mean(axis=-1, keepdims=True))*window, axis=-1, workers=workers)
+    ps_rms = (2*np.abs(e_f[..., 0:N//2])**2)/(s1**2)
+    usefull = ps_rms*scaling_factor_adc
+    
+    xf = fftfreq(N, T)
+    return {
+        "dist": freq_to_dist(xf[0:N//2]),
+        "copol": usefull[:, 0],
+        "crosspol": usefull[:, 1],
+        "copol_mean": usefull[:, 0].mean(axis=0),
+        "crosspol_mean": usefull[:, 1].mean(axis=0),
+    }
+
+def process_recording(filename, window="hft95", workers=None):
+    """
+    Loads a text or binary recording and computes the range spectra of all its chirps.
+    
+    Parameters:
+        filename (str): Path of the recording.
+        window (str or int): Window kind for get_window.
+        workers (int): Number of scipy.fft threads, see range_spectra.
+    
+    Returns:
+        dict: Result of range_spectra plus "header" and "timestamps" of the recording.
+    """
+    header, chirps, timestamps = load_recording(filename)
+    result = range_spectra(chirps, window=window, workers=workers)
+    result["header"] = header
+    result["timestamps"] = timestamps
+    return result
+
+
+if __name__ == "__main__":
+    import sys
+    
+    for dat in sys.argv[1:]:
+        result = process_recording(dat, workers=-1)
+        peak = np.argmax(result["copol_mean"])
+        print(f"{dat}: {len(result['copol'])} chirps, co-polar peak at {result['dist'][peak]:.2f} m")
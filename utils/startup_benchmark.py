@@ -0,0 +1,120 @@
+"""
+Startup time benchmark of the entry points.
+
+Imports each module in a fresh interpreter with `python -X importtime`, reports the best
+cumulative import time of several runs and checks that no heavy module is imported where
+it is not needed (matplotlib, scipy, pandas and pyserial are loaded on first use only).
+Exits with status 1 if a forbidden import shows up or, with --baseline, if a module got
+slower than the saved baseline by more than the tolerance.
+
+Usage:
+    python -m utils.startup_benchmark
+    python -m utils.startup_benchmark --save startup_baseline.json
+    python -m utils.startup_benchmark --baseline startup_baseline.json --tolerance 1.3
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+HEAVY = ("matplotlib", "scipy", "pandas", "serial")
+
+# Module to benchmark: top-level packages it must not import
+MODULES = {
+    "radar.radar": HEAVY,
+    "data_io.file_writer": HEAVY,
+    "data_io.file_reader": HEAVY,
+    "headless": HEAVY,
+    "main": HEAVY,
+    "utils.signal_processing2": HEAVY,
+    "utils.batch_process": HEAVY,
+    "Communication.CP210X_USB_Interface": HEAVY,
+}
+
+
+def import_profile(module):
+    """
+    Imports module in a fresh interpreter.
+
+    Returns:
+        tuple: (seconds, packages) with the cumulative import time of module and the set of
+               top-level packages imported on the way.
+    """
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                            cwd=ROOT, capture_output=True, text=True)
+    if result.returncode != 0:
+        error = [line for line in result.stderr.splitlines() if not line.startswith("import time:")]
+        raise RuntimeError(f"Importing {module} failed:\n" + "\n".join(error))
+    seconds, packages = None, set()
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        name = name.strip()
+        if not cumulative.strip().isdigit():
+            continue  # column titles
+        packages.add(name.split('.')[0])
+        if name == module:
+            seconds = int(cumulative) * 1e-6
+    return seconds, packages
+
+
+def run_benchmark(modules=MODULES, runs=5):
+    """
+    Measures every module runs times.
+
+    Returns:
+        dict: Module mapped to (best seconds, forbidden packages it imported).
+    """
+    results = {}
+    for module, forbidden in modules.items():
+        times, imported = [], set()
+        for _ in range(runs):
+            seconds, packages = import_profile(module)
+            times.append(seconds)
+            imported |= packages
+        results[module] = (min(times), sorted(imported.intersection(forbidden)))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure and gate the import time of the entry points.")
+    parser.add_argument("--runs", type=int, default=5, help="imports per module, the best time counts")
+    parser.add_argument("--save", help="write the measured times to this JSON file as new baseline")
+    parser.add_argument("--baseline", help="JSON file with baseline times to compare against")
+    parser.add_argument("--tolerance", type=float, default=1.3, help="allowed slowdown factor against the baseline")
+    parser.add_argument("--slack", type=float, default=0.02, help="allowed slowdown in seconds, absorbs noise of fast modules")
+    args = parser.parse_args()
+
+    baseline = {}
+    if args.baseline:
+        with open(args.baseline) as file:
+            baseline = json.load(file)
+
+    failures = []
+    results = run_benchmark(runs=args.runs)
+    for module, (seconds, forbidden) in results.items():
+        line = f"{module:40s} {seconds * 1000:8.1f} ms"
+        if module in baseline:
+            limit = baseline[module] * args.tolerance + args.slack
+            line += f"   baseline {baseline[module] * 1000:8.1f} ms"
+            if seconds > limit:
+                failures.append(f"{module} takes {seconds * 1000:.1f} ms, limit {limit * 1000:.1f} ms")
+        if forbidden:
+            failures.append(f"{module} imports {', '.join(forbidden)}")
+        print(line)
+
+    if args.save:
+        with open(args.save, 'w') as file:
+            json.dump({module: round(seconds, 4) for module, (seconds, _) in results.items()}, file, indent=2)
+
+    for failure in failures:
+        print("FAIL:", failure)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())